@@ -157,6 +157,8 @@ func RunBootstrapNewAgent(ctx context.Context, arguments string) (string, string
 		"protocol.py",
 		"secrets.py",
 		"cli.py",
+		"coercion.py",
+		"daemon.py",
 	}
 	for _, fileName := range sdkFiles {
 		embedPath := filepath.Join("python-base/opperator", fileName)
@@ -35,15 +35,63 @@ from opperator import (
 
 import time
 import threading
-from typing import Any, Dict, Optional
+from functools import cached_property
+from typing import Any, Dict, Optional, Tuple
 from dataclasses import dataclass, field
 
 
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+# Greeting suffixes for enthusiasm levels 0-10, built once at import
+_EXCLAMATIONS = tuple("!" * i for i in range(11))
+
+
+# =============================================================================
+# COMMAND ARGUMENT SCHEMAS (built once at import, shared by all instances)
+# =============================================================================
+
+_GREET_ARGS = (
+    CommandArgument("name", "string", "Person's name", required=True),
+    CommandArgument("enthusiasm", "integer", "Level 1-10", default=5),
+)
+
+_RUN_TASK_ARGS = (
+    CommandArgument("duration", "integer", "Task duration (seconds)", default=10),
+)
+
+_ADD_TAGS_ARGS = (
+    CommandArgument("item_id", "string", "Item ID", required=True),
+    CommandArgument("tags", "array", "List of tags",
+                    items={"type": "string"}, required=True),
+)
+
+_BATCH_UPDATE_AGES_ARGS = (
+    CommandArgument("user_ids", "array", "User IDs to update",
+                    items={"type": "integer"}, required=True),
+    CommandArgument("increment", "integer", "Age increment", default=1),
+)
+
+_CREATE_USERS_ARGS = (
+    CommandArgument("users", "array", "User objects to create",
+                    items={
+                        "type": "object",
+                        "properties": {
+                            "name": {"type": "string", "required": True},
+                            "email": {"type": "string", "required": True},
+                            "age": {"type": "integer"},
+                            "active": {"type": "boolean"},
+                        },
+                    }, required=True),
+)
+
+
 # =============================================================================
 # AGENT STATE (Optional - for organizing runtime data)
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class AgentState:
     """Centralized state container. Use when tracking multiple runtime values."""
     heartbeat_count: int = 0
@@ -66,11 +114,22 @@ class ComprehensiveAgent(OpperatorAgent):
             # max_async_workers=4  # Custom thread pool size
         )
 
-        self.state = AgentState()
+        # Plain Lock on purpose: nothing acquires it re-entrantly, and an
+        # uncontended Lock is much cheaper than RLock. Don't nest acquisitions.
         self._state_lock = threading.Lock()
+        # (heartbeat_count, last_activity, metrics) copy of state. Writers
+        # rebind it and never mutate it, so readers never need the lock
+        self._state_snapshot: Tuple[int, Optional[float], Dict[str, Any]] = (
+            0, None, {},
+        )
         self._stop_worker = threading.Event()
         self._worker_thread: Optional[threading.Thread] = None
 
+    @cached_property
+    def state(self) -> AgentState:
+        """Runtime state, created on first use so unused agents skip it."""
+        return AgentState()
+
     # ---------------------------------------------------------------------------
     # REQUIRED: initialize()
     # ---------------------------------------------------------------------------
@@ -116,10 +175,7 @@ class ComprehensiveAgent(OpperatorAgent):
         #     title="Greet User",
         #     description="Generate personalized greeting",
         #     expose_as=[CommandExposure.AGENT_TOOL],
-        #     arguments=[
-        #         CommandArgument("name", "string", "Person's name", required=True),
-        #         CommandArgument("enthusiasm", "integer", "Level 1-10", default=5),
-        #     ],
+        #     arguments=_GREET_ARGS,
         # )
 
         # Async command with progress reporting
@@ -128,9 +184,7 @@ class ComprehensiveAgent(OpperatorAgent):
         #     self._cmd_run_task,
         #     title="Run Long Task",
         #     description="Long-running task with progress updates",
-        #     arguments=[
-        #         CommandArgument("duration", "integer", "Task duration (seconds)", default=10),
-        #     ],
+        #     arguments=_RUN_TASK_ARGS,
         #     async_enabled=True,
         #     progress_label="Running task",
         # )
@@ -139,42 +193,30 @@ class ComprehensiveAgent(OpperatorAgent):
         # self.register_command(
         #     "add_tags",
         #     self._cmd_add_tags,
-        #     arguments=[
-        #         CommandArgument("item_id", "string", "Item ID", required=True),
-        #         CommandArgument("tags", "array", "List of tags",
-        #                       items={"type": "string"}, required=True),
-        #     ],
+        #     arguments=_ADD_TAGS_ARGS,
         # )
 
         # Array arguments - integers
         # self.register_command(
         #     "batch_update_ages",
         #     self._cmd_batch_update_ages,
-        #     arguments=[
-        #         CommandArgument("user_ids", "array", "User IDs to update",
-        #                       items={"type": "integer"}, required=True),
-        #         CommandArgument("increment", "integer", "Age increment", default=1),
-        #     ],
+        #     arguments=_BATCH_UPDATE_AGES_ARGS,
         # )
 
         # Array arguments - objects
         # self.register_command(
         #     "create_users",
         #     self._cmd_create_users,
-        #     arguments=[
-        #         CommandArgument("users", "array", "User objects to create",
-        #                       items={
-        #                           "type": "object",
-        #                           "properties": {
-        #                               "name": {"type": "string", "required": True},
-        #                               "email": {"type": "string", "required": True},
-        #                               "age": {"type": "integer"},
-        #                               "active": {"type": "boolean"},
-        #                           },
-        #                       }, required=True),
-        #     ],
+        #     arguments=_CREATE_USERS_ARGS,
         # )
 
+        # Several commands at once (publishes the command registry once)
+        # self.register_commands([
+        #     {"name": "ping", "handler": self._cmd_ping},
+        #     {"name": "greet", "handler": self._cmd_greet, "arguments": _GREET_ARGS},
+        #     {"name": "add_tags", "handler": self._cmd_add_tags, "arguments": _ADD_TAGS_ARGS},
+        # ])
+
         # -----------------------------------------------------------------------
         # SIDEBAR SECTIONS (uncomment as needed)
         # -----------------------------------------------------------------------
@@ -225,20 +267,22 @@ class ComprehensiveAgent(OpperatorAgent):
         return {"message": "pong", "timestamp": time.time()}
 
     def _cmd_get_status(self, args: Dict[str, Any]) -> Dict[str, Any]:
-        """Returns current status. Use locks when reading shared state."""
-        with self._state_lock:
-            return {
-                "running": self.running,
-                "heartbeat_count": self.state.heartbeat_count,
-                "last_activity": self.state.last_activity,
-                "metrics": self.state.metrics.copy(),
-            }
+        """Returns current status from the published snapshot (no lock needed)."""
+        heartbeat_count, last_activity, metrics = self._state_snapshot
+        return {
+            "running": self.running,
+            "heartbeat_count": heartbeat_count,
+            "last_activity": last_activity,
+            "metrics": metrics,
+        }
 
     def _cmd_greet(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Generate personalized greeting."""
         name = args.get("name", "friend")
         enthusiasm = args.get("enthusiasm", 5)
-        exclamation = "!" * min(enthusiasm, 10)
+        exclamation = _EXCLAMATIONS[max(0, min(enthusiasm, 10))]
+        # A single f-string is the cheapest way to build this. When joining
+        # many parts, use "".join(parts) rather than repeated += concatenation.
         greeting = f"Hello, {name}{exclamation}"
 
         self.log(LogLevel.INFO, "Generated greeting", name=name, enthusiasm=enthusiasm)
@@ -251,18 +295,38 @@ class ComprehensiveAgent(OpperatorAgent):
         """
         duration = max(1, args.get("duration", 10))
         self.log(LogLevel.INFO, "Starting long task", duration=duration)
-        start_time = time.time()
-
+        start_time = time.monotonic()
+
+        # Schedule each step against a fixed deadline so progress reporting
+        # doesn't accumulate drift, and wait on the stop event so shutdown
+        # interrupts the task instead of sleeping through it.
+        deadline = start_time
+        # report_progress serializes immediately, so one metadata dict can be
+        # reused across steps
+        metadata = {"step": 0}
+        report_progress = self.report_progress
         for i in range(duration):
-            self.report_progress(
+            metadata["step"] = i + 1
+            report_progress(
                 text=f"Processing step {i + 1}/{duration}",
                 progress=(i + 1) / duration,
-                metadata={"step": i + 1},
+                metadata=metadata,
                 status="running",
             )
-            time.sleep(1)
-
-        elapsed = time.time() - start_time
+            deadline += 1.0
+            remaining = deadline - time.monotonic()
+            if remaining > 0 and self._stop_worker.wait(timeout=remaining):
+                # Stopped during step i + 1, so only i steps finished
+                elapsed = time.monotonic() - start_time
+                self.log(LogLevel.WARNING, "Task cancelled", elapsed=elapsed, steps=i)
+                return {
+                    "success": False,
+                    "cancelled": True,
+                    "elapsed": elapsed,
+                    "steps_completed": i,
+                }
+
+        elapsed = time.monotonic() - start_time
         self.log(LogLevel.INFO, "Task completed", elapsed=elapsed)
         return {"success": True, "elapsed": elapsed}
 
@@ -271,7 +335,7 @@ class ComprehensiveAgent(OpperatorAgent):
         item_id = args["item_id"]
         tags = args["tags"]  # Validated as array of strings
 
-        self.log(LogLevel.INFO, f"Adding {len(tags)} tags to {item_id}", tags=tags)
+        self.log(LogLevel.INFO, "Adding tags", item_id=item_id, count=len(tags), tags=tags)
         return {"success": True, "item_id": item_id, "tags_added": tags, "count": len(tags)}
 
     def _cmd_batch_update_ages(self, args: Dict[str, Any]) -> Dict[str, Any]:
@@ -279,24 +343,25 @@ class ComprehensiveAgent(OpperatorAgent):
         user_ids = args["user_ids"]  # Validated as array of integers
         increment = args["increment"]
 
-        self.log(LogLevel.INFO, f"Updating {len(user_ids)} users by {increment}")
+        self.log(LogLevel.INFO, "Updating user ages", count=len(user_ids), increment=increment)
         return {"success": True, "users_updated": len(user_ids), "increment": increment}
 
     def _cmd_create_users(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Create users (array of objects)."""
         users = args["users"]  # Validated as array of user objects
 
-        self.log(LogLevel.INFO, f"Creating {len(users)} users")
+        self.log(LogLevel.INFO, "Creating users", count=len(users))
 
-        created = []
-        for user in users:
-            created.append({
-                "id": len(created) + 1,
+        created = [
+            {
+                "id": user_id,
                 "name": user["name"],
                 "email": user["email"],
                 "age": user.get("age"),
                 "active": user.get("active", True),
-            })
+            }
+            for user_id, user in enumerate(users, 1)
+        ]
 
         return {"success": True, "users_created": len(created), "users": created}
 
@@ -304,21 +369,32 @@ class ComprehensiveAgent(OpperatorAgent):
     # BACKGROUND WORKER
     # ===========================================================================
 
+    def _publish_state(self) -> None:
+        """Publish a snapshot of state that is never mutated. Call with _state_lock held."""
+        self._state_snapshot = (
+            self.state.heartbeat_count,
+            self.state.last_activity,
+            dict(self.state.metrics),
+        )
+
     # def _heartbeat_worker(self) -> None:
     #     """Background worker - runs periodically until shutdown."""
     #     while not self._stop_worker.is_set():
+    #         now = time.time()
     #         with self._state_lock:
     #             self.state.heartbeat_count += 1
-    #             self.state.last_activity = time.time()
+    #             self.state.last_activity = now
     #             count = self.state.heartbeat_count
+    #             self._publish_state()
     #
     #         self.log(LogLevel.DEBUG, "Heartbeat", count=count)
     #
     #         # Update sidebar
+    #         t = time.localtime(now)
     #         self.update_section(
     #             "metrics",
     #             f"<b>Heartbeats:</b> {count}\n"
-    #             f'<b>Last activity:</b> {time.strftime("%H:%M:%S")}',
+    #             f"<b>Last activity:</b> {t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}",
     #         )
     #
     #         # Wait 30s (interruptible by shutdown)
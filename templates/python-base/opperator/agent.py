@@ -1,16 +1,18 @@
 """Base class for Opperator-managed agents."""
 
+import bisect
 import copy
 import json
 import os
-import socket
+import re
 import sys
-import tempfile
 import threading
 import traceback
 from abc import ABC, abstractmethod
 from concurrent.futures import ThreadPoolExecutor
-from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Union
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 from .protocol import (
     Protocol,
@@ -23,48 +25,124 @@ from .protocol import (
     CommandArgument,
     CommandExposure,
     SlashCommandScope,
+    _encode_json,
+    iter_fd_lines,
 )
+from . import daemon
 from . import secrets as secret_client
+from .coercion import _COERCION_ERRORS, Coercer, compile_coercer
 from .lifecycle import LifecycleManager
 from . import cli
 
 
+_INVOCATION_DIR_REQUEST = json.dumps({"type": "get_invocation_dir"}).encode("utf-8") + b"\n"
+
+# One decoder shared by the message reader; raw_decode parses a JSON value
+# starting at an offset, so several objects on one line need no re-slicing.
+_decode_json_prefix = json.JSONDecoder().raw_decode
+_skip_json_whitespace = re.compile(r"[ \t\n\r]*").match
+
+# Argument defaults of these types are handed out as-is; anything else is
+# deep-copied per invocation so handlers can't mutate the shared default.
+_IMMUTABLE_DEFAULT_TYPES = frozenset({str, int, float, bool, bytes})
+
+# Async commands allowed in flight (running or queued) per worker thread.
+_ASYNC_QUEUE_FACTOR = 4
+
+_DEFAULT_MAX_ASYNC_WORKERS = max(1, min(8, os.cpu_count() or 1))
+
+# Compiled argument coercers kept per agent before the cache is reset.
+_COERCER_CACHE_SIZE = 256
+
+# (command_id, invocation_dir) of the command running in the current
+# context; set around each handler call. Context variables must be created
+# once at module level, since contexts keep strong references to them.
+_COMMAND_CONTEXT: ContextVar[Tuple[Optional[str], Optional[str]]] = ContextVar(
+    "opperator_command_context", default=(None, None)
+)
+
+_EXPOSURES_BY_VALUE: Dict[str, CommandExposure] = {
+    exposure.value: exposure for exposure in CommandExposure
+}
+
+
+def _strip_identifier(value: Any) -> str:
+    """Return ``str(value or "").strip()``, skipping the copies for clean strings."""
+    if type(value) is str and value and not value[0].isspace() and not value[-1].isspace():
+        return value
+    return str(value or "").strip()
+
+
+def _iter_stdin_lines() -> Iterator[bytes]:
+    """Yield raw lines from stdin, reading its file descriptor in large chunks.
+
+    Falls back to ``readline`` when stdin has no usable file descriptor
+    (e.g. it was replaced with an ``io.StringIO`` in tests), encoding text
+    lines so callers always get bytes.
+    """
+    try:
+        fd = sys.stdin.fileno()
+    except (AttributeError, OSError, ValueError):
+        stream = getattr(sys.stdin, "buffer", sys.stdin)
+        while True:
+            line = stream.readline()
+            if not line:
+                return
+            yield line.encode("utf-8") if isinstance(line, str) else line
+
+    yield from iter_fd_lines(fd)
+
+
+def _decode_json_objects(text: str) -> List[Dict[str, Any]]:
+    """Decode a line holding one or more whitespace-separated JSON objects.
+
+    Returns an empty list, so the whole line is ignored, when any part of it
+    is not JSON or a value is not an object. A log line such as
+    ``2024-01-01 manager started`` would otherwise decode to a leading int.
+    """
+    objects: List[Dict[str, Any]] = []
+    pos, end = 0, len(text)
+    while pos < end:
+        try:
+            data, pos = _decode_json_prefix(text, pos)
+        except ValueError:
+            return []
+        if type(data) is not dict:
+            return []
+        objects.append(data)
+        pos = _skip_json_whitespace(text, pos).end()
+    return objects
+
+
 def _fetch_invocation_directory_from_daemon(timeout: float = 2.0) -> Optional[str]:
     """Fetch the current invocation directory from the daemon.
 
     Returns None if unable to fetch (daemon not available, etc.)
     """
-    socket_path = os.environ.get("OPPERATOR_SOCKET_PATH")
-    if not socket_path:
-        socket_path = os.path.join(tempfile.gettempdir(), "opperator.sock")
-
-    payload = {"type": "get_invocation_dir"}
-
     try:
-        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
-            sock.settimeout(timeout)
-            sock.connect(socket_path)
-            raw = json.dumps(payload).encode("utf-8") + b"\n"
-            sock.sendall(raw)
-
-            # Read response
-            with sock.makefile("r", encoding="utf-8") as reader:
-                line = reader.readline()
-                if not line:
-                    return None
-
-                response = json.loads(line)
-                if response.get("success") and response.get("invocation_dir"):
-                    return response["invocation_dir"]
-                return None
-    except (OSError, json.JSONDecodeError, KeyError):
+        line = daemon.request(_INVOCATION_DIR_REQUEST, timeout)
+    except OSError:
         # Silently fail - invocation directory is optional at startup
         return None
 
+    if not line:
+        return None
+    try:
+        response = json.loads(line)
+    except ValueError:
+        return None
+    if response.get("success") and response.get("invocation_dir"):
+        return response["invocation_dir"]
+    return None
+
 
 class OpperatorAgent(ABC):
     """Base class for creating Opperator-managed agents."""
 
+    # Longest JSON string (in characters) accepted for an array or object
+    # argument; None disables the check.
+    max_json_argument_length: Optional[int] = 16 * 1024 * 1024
+
     def __init__(
         self,
         name: str = None,
@@ -85,16 +163,31 @@ class OpperatorAgent(ABC):
         # Command handling
         self._command_handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
         self._command_metadata: Dict[str, CommandDefinition] = {}
-        self._argument_schemas: Dict[str, List[CommandArgument]] = {}
+        self._command_payloads: Dict[str, Dict[str, Any]] = {}
+        self._command_registry_json: Optional[str] = None
+        self._sorted_command_names: List[str] = []
+        self._registry_batch_depth = 0
+        self._registry_dirty = False
+        self._argument_validators: Dict[
+            str, Callable[[Optional[Dict[str, Any]]], Dict[str, Any]]
+        ] = {}
+        self._coercer_cache: Dict[Tuple[Any, ...], Tuple[Any, Any, Coercer]] = {}
+        self._message_dispatch: Dict[MessageType, Callable[[Dict[str, Any]], None]] = {
+            MessageType.COMMAND: self._dispatch_command_data,
+            MessageType.LIFECYCLE_EVENT: self._dispatch_lifecycle_data,
+        }
         self._message_thread: Optional[threading.Thread] = None
         self._stop_reading = threading.Event()
-        self._command_state = threading.local()
         self._invocation_dir: Optional[str] = None
         self._max_async_workers = (
             max_async_workers if (max_async_workers or 0) > 0 else None
         )
         self._async_executor: Optional[ThreadPoolExecutor] = None
         self._async_executor_lock = threading.Lock()
+        self._thread_prefix = (
+            self.name.strip().lower().replace(" ", "-")[:32] or "opperator-agent"
+        )
+        self._async_slots: Optional[threading.BoundedSemaphore] = None
 
         # Sidebar sections
         self._sidebar_sections: Dict[str, Dict[str, Any]] = {}
@@ -152,14 +245,56 @@ class OpperatorAgent(ABC):
         )
 
         normalized_definition = definition.normalized()
+        # Build everything that can fail before touching the registry, so a
+        # bad schema leaves no half-registered command behind.
+        validator = self._compile_argument_validator(normalized_definition)
+        payload = normalized_definition.to_dict()
 
+        if command_name not in self._command_handlers:
+            bisect.insort(self._sorted_command_names, command_name)
         self._command_handlers[command_name] = handler
         self._command_metadata[command_name] = normalized_definition
-        self._argument_schemas[command_name] = list(
-            normalized_definition.arguments or []
-        )
+        self._command_payloads[command_name] = payload
+        self._command_registry_json = None
+        self._argument_validators[command_name] = validator
         self._publish_command_registry()
 
+    def register_commands(self, commands: Iterable[Dict[str, Any]]) -> None:
+        """Register several commands and publish the registry once.
+
+        Each entry holds the arguments accepted by :meth:`register_command`,
+        including ``name`` and ``handler``.
+
+        Example:
+            self.register_commands([
+                {"name": "ping", "handler": self._cmd_ping},
+                {"name": "greet", "handler": self._cmd_greet, "arguments": GREET_ARGS},
+            ])
+        """
+        with self.batch_commands():
+            for spec in commands:
+                self.register_command(**spec)
+
+    @contextmanager
+    def batch_commands(self) -> Iterator[None]:
+        """Defer command registry updates until the block exits.
+
+        Commands registered or unregistered inside the block are published
+        to the manager as a single registry update.
+
+        Example:
+            with self.batch_commands():
+                self.register_command("ping", self._cmd_ping)
+                self.unregister_command("legacy_ping")
+        """
+        self._registry_batch_depth += 1
+        try:
+            yield
+        finally:
+            self._registry_batch_depth -= 1
+            if self._registry_batch_depth == 0 and self._registry_dirty:
+                self._publish_command_registry()
+
     def unregister_command(self, name: str) -> bool:
         """Unregister a previously registered command.
 
@@ -180,17 +315,30 @@ class OpperatorAgent(ABC):
 
         del self._command_handlers[command_name]
         del self._command_metadata[command_name]
-        del self._argument_schemas[command_name]
+        del self._command_payloads[command_name]
+        self._command_registry_json = None
+        self._sorted_command_names.remove(command_name)
+        del self._argument_validators[command_name]
 
         self._publish_command_registry()
         return True
 
-    def _command_definitions(self) -> Iterable[CommandDefinition]:
-        for name in sorted(self._command_handlers.keys()):
-            definition = self._command_metadata.get(name)
-            if definition is None:
-                definition = CommandDefinition(name=name)
-            yield definition.normalized()
+    def _command_registry_payload(self) -> List[Dict[str, Any]]:
+        """Serialized definitions of all commands, sorted by name.
+
+        Definitions are serialized once at registration and names are kept
+        sorted as commands come and go, so this is a single O(N) pass.
+        """
+        payloads = self._command_payloads
+        return [payloads[name] for name in self._sorted_command_names]
+
+    def _command_registry_response_json(self) -> str:
+        """JSON array of the registry, reused until a command is (un)registered."""
+        cached = self._command_registry_json
+        if cached is None:
+            cached = _encode_json(self._command_registry_payload())
+            self._command_registry_json = cached
+        return cached
 
     def set_system_prompt(self, prompt: Optional[str], *, replace: bool = False) -> None:
         """Set the system prompt that should guide the managed agent.
@@ -225,21 +373,25 @@ class OpperatorAgent(ABC):
                 '<b>CPU:</b> <c fg="green">23%</c>\\n<b>Memory:</b> <c fg="yellow">67%</c>'
             )
         """
-        section_id = str(section_id or "").strip()
-        if not section_id:
-            raise ValueError("section_id cannot be empty")
+        section_id = self._normalize_section_id(section_id)
 
         title = str(title or "").strip()
         if not title:
             title = section_id
 
-        self._sidebar_sections[section_id] = {
+        section = {
             'title': title,
             'content': str(content),
             'collapsed': bool(collapsed)
         }
+        if self._sidebar_sections.get(section_id) == section:
+            # Nothing changed since the last send
+            return
+        self._sidebar_sections[section_id] = section
 
-        Protocol.send_sidebar_section(section_id, title, content, collapsed)
+        Protocol.send_sidebar_section(
+            section_id, title, section['content'], section['collapsed']
+        )
 
     def update_section(self, section_id: str, content: str) -> None:
         """Update the content of an existing sidebar section.
@@ -251,18 +403,21 @@ class OpperatorAgent(ABC):
         Example:
             self.update_section("status", '<c fg="green">Connected</c> - 5 peers')
         """
-        section_id = str(section_id or "").strip()
-        if not section_id:
-            raise ValueError("section_id cannot be empty")
+        section_id = self._normalize_section_id(section_id)
 
-        if section_id not in self._sidebar_sections:
+        section = self._sidebar_sections.get(section_id)
+        if section is None:
             # If section doesn't exist yet, register it with a default title
             self.register_section(section_id, section_id, content)
             return
 
+        content = str(content)
+        if section['content'] == content:
+            # Skip resending unchanged content to the manager
+            return
+
         # Update the stored content
-        section = self._sidebar_sections[section_id]
-        section['content'] = str(content)
+        section['content'] = content
 
         # Send the update
         Protocol.send_sidebar_section(
@@ -281,9 +436,7 @@ class OpperatorAgent(ABC):
         Returns:
             True if the section was successfully unregistered, False if it didn't exist
         """
-        section_id = str(section_id or "").strip()
-        if not section_id:
-            raise ValueError("section_id cannot be empty")
+        section_id = self._normalize_section_id(section_id)
 
         if section_id not in self._sidebar_sections:
             self.log(
@@ -301,35 +454,45 @@ class OpperatorAgent(ABC):
     ) -> Optional[Iterable[CommandExposure]]:
         if expose_as is None:
             return None
-        exposures: List[CommandExposure] = []
         items: Sequence[Any]
         if isinstance(expose_as, (list, tuple, set)):
             items = expose_as
         else:
             items = (expose_as,)
-        seen: Set[CommandExposure] = set()
+        if all(isinstance(item, CommandExposure) for item in items):
+            return list(dict.fromkeys(items))
+        exposures: List[CommandExposure] = []
         for item in items:
             if isinstance(item, CommandExposure):
-                exposure = item
-            else:
-                try:
-                    exposure = CommandExposure(str(item))
-                except ValueError as exc:
-                    raise ValueError(f"unknown command exposure '{item}'") from exc
-            if exposure not in seen:
-                exposures.append(exposure)
-                seen.add(exposure)
-        return exposures
+                exposures.append(item)
+                continue
+            try:
+                exposures.append(_EXPOSURES_BY_VALUE[str(item)])
+            except KeyError as exc:
+                raise ValueError(f"unknown command exposure '{item}'") from exc
+        # dict.fromkeys drops duplicates while keeping first-seen order
+        return list(dict.fromkeys(exposures))
 
     @staticmethod
     def _normalize_command_name(name: str) -> str:
-        trimmed = str(name or "").strip()
+        trimmed = _strip_identifier(name)
         if not trimmed:
             raise ValueError("command name must be a non-empty string")
         return trimmed
 
+    @staticmethod
+    def _normalize_section_id(section_id: str) -> str:
+        trimmed = _strip_identifier(section_id)
+        if not trimmed:
+            raise ValueError("section_id cannot be empty")
+        return trimmed
+
     def _publish_command_registry(self):
-        Protocol.send_command_registry(self._command_definitions())
+        if self._registry_batch_depth:
+            self._registry_dirty = True
+            return
+        self._registry_dirty = False
+        Protocol.send_serialized_command_registry(self._command_registry_payload())
 
     def report_progress(
         self,
@@ -341,7 +504,7 @@ class OpperatorAgent(ABC):
     ) -> None:
         """Report incremental progress for the currently executing command."""
 
-        command_id = getattr(self._command_state, "command_id", None)
+        command_id = _COMMAND_CONTEXT.get()[0]
         if not command_id:
             return
         Protocol.send_command_progress(
@@ -468,10 +631,13 @@ class OpperatorAgent(ABC):
         """Start background thread to process incoming messages"""
 
         def read_loop():
+            # Read raw bytes and decode each line once; the shared decoder's
+            # raw_decode walks every JSON object on the line in place.
+            lines = _iter_stdin_lines()
             while not self._stop_reading.is_set():
                 try:
-                    line = sys.stdin.readline()
-                    if not line:
+                    line = next(lines, None)
+                    if line is None:
                         break
 
                     line = line.strip()
@@ -479,11 +645,12 @@ class OpperatorAgent(ABC):
                         continue
 
                     try:
-                        msg = Message.from_json(line)
-                        self._handle_message(msg)
-                    except json.JSONDecodeError:
-                        # Ignore non-JSON output
+                        text = line.decode("utf-8")
+                    except UnicodeDecodeError:
                         continue
+
+                    for data in _decode_json_objects(text):
+                        self._handle_message(Message.from_dict(data))
                 except Exception as exc:
                     Protocol.send_error(f"Error reading manager message: {exc}")
                     break
@@ -493,29 +660,32 @@ class OpperatorAgent(ABC):
         self._message_thread.start()
 
     def _handle_message(self, msg: Message):
-        if msg.type == MessageType.COMMAND and msg.data:
-            cmd = CommandMessage.from_dict(msg.data)
-            if cmd.command:
-                self._handle_command(cmd)
-        elif msg.type == MessageType.LIFECYCLE_EVENT and msg.data:
-            event = LifecycleEventMessage.from_dict(msg.data)
-            self._handle_lifecycle_event(event)
+        handler = self._message_dispatch.get(msg.type)
+        if handler is not None and msg.data:
+            handler(msg.data)
+
+    def _dispatch_command_data(self, data: Dict[str, Any]) -> None:
+        cmd = CommandMessage.from_dict(data)
+        if cmd.command:
+            self._handle_command(cmd)
+
+    def _dispatch_lifecycle_data(self, data: Dict[str, Any]) -> None:
+        self._handle_lifecycle_event(LifecycleEventMessage.from_dict(data))
 
     def _handle_command(self, cmd: CommandMessage):
         # Safely retrieve invocation_dir (where user ran 'op' from)
-        invocation_dir = self._resolve_invocation_dir(getattr(cmd, "working_dir", None))
+        invocation_dir = self._resolve_invocation_dir(cmd.working_dir)
         if invocation_dir:
             self._invocation_dir = invocation_dir
 
         if cmd.command == "__list_commands":
-            self._set_command_context(cmd.id, invocation_dir)
+            token = self._set_command_context(cmd.id, invocation_dir)
             try:
-                commands = [
-                    definition.to_dict() for definition in self._command_definitions()
-                ]
-                Protocol.send_response(success=True, command_id=cmd.id, result=commands)
+                Protocol.send_serialized_response(
+                    command_id=cmd.id, result_json=self._command_registry_response_json()
+                )
             finally:
-                self._clear_command_context()
+                self._clear_command_context(token)
             return
 
         handler = self._command_handlers.get(cmd.command)
@@ -527,12 +697,12 @@ class OpperatorAgent(ABC):
             )
             return
 
+        definition = self._command_metadata.get(cmd.command)
+        validator = self._argument_validators.get(cmd.command)
+        if validator is None:
+            validator = self._compile_argument_validator(definition)
         try:
-            definition = self._command_metadata.get(cmd.command)
-            schema = self._argument_schemas.get(cmd.command)
-            prepared_args = self._prepare_command_arguments(
-                definition, schema, cmd.args
-            )
+            prepared_args = validator(cmd.args)
         except ValueError as exc:
             Protocol.send_response(success=False, command_id=cmd.id, error=str(exc))
             return
@@ -553,9 +723,26 @@ class OpperatorAgent(ABC):
     ) -> None:
         try:
             executor = self._ensure_async_executor()
-            executor.submit(
-                self._execute_command, cmd, handler, prepared_args, invocation_dir
-            )
+            slots = self._async_slots
+            if not slots.acquire(blocking=False):
+                self.log(
+                    LogLevel.WARNING,
+                    f"Async queue full; rejecting command '{cmd.command}'",
+                )
+                Protocol.send_response(
+                    success=False,
+                    command_id=cmd.id,
+                    error="agent busy: async queue full",
+                )
+                return
+            try:
+                future = executor.submit(
+                    self._execute_command, cmd, handler, prepared_args, invocation_dir
+                )
+            except BaseException:
+                slots.release()
+                raise
+            future.add_done_callback(lambda _: slots.release())
         except Exception as exc:  # pragma: no cover - defensive guard
             self.log(
                 LogLevel.ERROR,
@@ -571,7 +758,7 @@ class OpperatorAgent(ABC):
         prepared_args: Dict[str, Any],
         invocation_dir: Optional[str],
     ) -> None:
-        self._set_command_context(cmd.id, invocation_dir)
+        token = self._set_command_context(cmd.id, invocation_dir)
         try:
             result = handler(prepared_args)
         except Exception as exc:  # pragma: no cover - handler-specific failures
@@ -580,17 +767,15 @@ class OpperatorAgent(ABC):
         else:
             Protocol.send_response(success=True, command_id=cmd.id, result=result)
         finally:
-            self._clear_command_context()
+            self._clear_command_context(token)
 
     def _set_command_context(
         self, command_id: Optional[str], invocation_dir: Optional[str]
-    ) -> None:
-        setattr(self._command_state, "command_id", command_id)
-        setattr(self._command_state, "invocation_directory", invocation_dir)
+    ) -> Token:
+        return _COMMAND_CONTEXT.set((command_id, invocation_dir))
 
-    def _clear_command_context(self) -> None:
-        setattr(self._command_state, "command_id", None)
-        setattr(self._command_state, "invocation_directory", None)
+    def _clear_command_context(self, token: Token) -> None:
+        _COMMAND_CONTEXT.reset(token)
 
     def _ensure_async_executor(self) -> ThreadPoolExecutor:
         if self._async_executor is not None:
@@ -601,22 +786,19 @@ class OpperatorAgent(ABC):
 
             max_workers = self._max_async_workers
             if max_workers is None:
-                cpu_count = os.cpu_count() or 1
-                max_workers = max(1, min(8, cpu_count))
+                max_workers = _DEFAULT_MAX_ASYNC_WORKERS
 
-            prefix = self._async_thread_prefix()
+            # Running plus queued async commands are capped so a burst can't
+            # pile up unbounded work items behind the pool.
+            self._async_slots = threading.BoundedSemaphore(
+                max_workers * _ASYNC_QUEUE_FACTOR
+            )
             self._async_executor = ThreadPoolExecutor(
                 max_workers=max_workers,
-                thread_name_prefix=prefix,
+                thread_name_prefix=self._thread_prefix,
             )
             return self._async_executor
 
-    def _async_thread_prefix(self) -> str:
-        base = (self.name or "opperator-agent").strip().lower().replace(" ", "-")
-        if not base:
-            base = "opperator-agent"
-        return base[:32]
-
     def _shutdown_async_executor(self) -> None:
         with self._async_executor_lock:
             if self._async_executor is None:
@@ -644,7 +826,7 @@ class OpperatorAgent(ABC):
         Returns:
             The invocation directory path, or None if not set yet
         """
-        invocation_dir = getattr(self._command_state, "invocation_directory", None)
+        invocation_dir = _COMMAND_CONTEXT.get()[1]
         if invocation_dir:
             return invocation_dir
         if self._invocation_dir:
@@ -662,57 +844,95 @@ class OpperatorAgent(ABC):
         """
         return os.path.abspath(os.getcwd())
 
-    def _prepare_command_arguments(
-        self,
-        definition: Optional[CommandDefinition],
-        schema: Optional[Sequence[CommandArgument]],
-        args: Optional[Dict[str, Any]],
-    ) -> Dict[str, Any]:
-        incoming = dict(args or {})
-        if schema:
-            return self._coerce_arguments_from_schema(list(schema), incoming)
-
-        if definition and definition.argument_required and not incoming:
-            raise ValueError("Arguments are required for this command")
+    def _compile_argument_validator(
+        self, definition: Optional[CommandDefinition]
+    ) -> Callable[[Optional[Dict[str, Any]]], Dict[str, Any]]:
+        """Build an argument validator specialized to one command's schema.
 
-        return incoming
+        Argument names, defaults, required flags, enums and value coercers
+        are resolved once at registration; each invocation only walks the
+        prepared tuples.
+        """
+        schema = tuple(definition.arguments or ()) if definition else ()
+
+        if not schema:
+            argument_required = bool(definition and definition.argument_required)
+
+            def validate_unstructured(args: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+                # Decoded args are owned by this command, so a dict is passed
+                # through rather than copied.
+                incoming = args if type(args) is dict else dict(args or {})
+                if argument_required and not incoming:
+                    raise ValueError("Arguments are required for this command")
+                return incoming
+
+            return validate_unstructured
+
+        plan = tuple(
+            (
+                argument.name,
+                self._argument_coercer(argument),
+                argument.default,
+                type(argument.default) not in _IMMUTABLE_DEFAULT_TYPES,
+                argument.required,
+                list(argument.enum) if argument.enum else None,
+            )
+            for argument in schema
+        )
 
-    def _coerce_arguments_from_schema(
-        self,
-        schema: Sequence[CommandArgument],
-        incoming: Dict[str, Any],
-    ) -> Dict[str, Any]:
-        normalized: Dict[str, Any] = {}
-        for argument in schema:
-            name = argument.name
-            has_value = name in incoming and incoming[name] is not None
-            value = incoming.get(name)
-
-            if not has_value:
-                if argument.default is not None:
-                    value = copy.deepcopy(argument.default)
-                elif argument.required:
-                    raise ValueError(f"Missing required argument '{name}'")
+        def validate(args: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+            # Only read from here on; the normalized result is a new dict.
+            incoming = args if type(args) is dict else dict(args or {})
+            normalized: Dict[str, Any] = {}
+            for name, coerce, default, copy_default, required, enum in plan:
+                value = incoming.get(name)
+                if value is None:
+                    if default is not None:
+                        value = copy.deepcopy(default) if copy_default else default
+                    elif required:
+                        raise ValueError(f"Missing required argument '{name}'")
+                    else:
+                        continue
                 else:
-                    continue
-            else:
-                value = self._coerce_argument_value(
-                    argument.type, value, argument.items, argument.properties
-                )
+                    try:
+                        value = coerce(value)
+                    except _COERCION_ERRORS as exc:
+                        raise ValueError(f"Invalid value for '{name}': {exc}") from exc
 
-            if argument.enum and value not in argument.enum:
-                raise ValueError(
-                    f"Invalid value for '{name}'; expected one of {list(argument.enum)}"
-                )
+                if enum is not None and value not in enum:
+                    raise ValueError(
+                        f"Invalid value for '{name}'; expected one of {enum}"
+                    )
+
+                normalized[name] = value
+
+            # Preserve additional arguments that aren't in the schema. The
+            # keys-view subset test runs in C and, in the common case of no
+            # extras, skips the Python-level scan entirely.
+            if not incoming.keys() <= normalized.keys():
+                for key, value in incoming.items():
+                    if key not in normalized:
+                        normalized[key] = value
+
+            return normalized
+
+        return validate
+
+    def _argument_coercer(self, argument: CommandArgument) -> Coercer:
+        """Return the function that coerces one argument's incoming value.
 
-            normalized[name] = value
+        Subclasses that override :meth:`_coerce_argument_value` keep having
+        it called for every argument value; otherwise the compiled coercer
+        is used directly.
+        """
+        arg_type, items, properties = argument.type, argument.items, argument.properties
+        if type(self)._coerce_argument_value is OpperatorAgent._coerce_argument_value:
+            return self._cached_coercer(arg_type, items, properties)
 
-        # Preserve additional arguments that aren't in the schema
-        for key, value in incoming.items():
-            if key not in normalized:
-                normalized[key] = value
+        def coerce_with_hook(value: Any) -> Any:
+            return self._coerce_argument_value(arg_type, value, items, properties)
 
-        return normalized
+        return coerce_with_hook
 
     def _coerce_argument_value(
         self,
@@ -721,127 +941,39 @@ class OpperatorAgent(ABC):
         items: Optional[Dict[str, Any]] = None,
         properties: Optional[Dict[str, Any]] = None,
     ) -> Any:
-        if value is None:
-            return None
+        """Coerce an argument value to its schema type.
 
-        arg_type = (arg_type or "string").lower()
-
-        if arg_type == "string":
-            return str(value)
-
-        if arg_type == "integer":
-            if isinstance(value, bool):
-                raise ValueError("Boolean value is not valid for integer argument")
-            if isinstance(value, int):
-                return value
-            if isinstance(value, float) and value.is_integer():
-                return int(value)
-            if isinstance(value, str):
-                stripped = value.strip()
-                return int(stripped, 10)
-            return int(value)
-
-        if arg_type == "number":
-            if isinstance(value, bool):
-                raise ValueError("Boolean value is not valid for number argument")
-            if isinstance(value, (int, float)):
-                return float(value)
-            if isinstance(value, str):
-                stripped = value.strip()
-                return float(stripped)
-            return float(value)
-
-        if arg_type == "boolean":
-            if isinstance(value, bool):
-                return value
-            if isinstance(value, str):
-                lowered = value.strip().lower()
-                if lowered in {"true", "1", "yes", "on"}:
-                    return True
-                if lowered in {"false", "0", "no", "off"}:
-                    return False
-                raise ValueError(f"Cannot interpret '{value}' as boolean")
-            if isinstance(value, (int, float)):
-                return bool(value)
-            raise ValueError(f"Cannot interpret '{value}' as boolean")
-
-        if arg_type == "array":
-            if isinstance(value, list):
-                arr = value
-            elif isinstance(value, str):
-                try:
-                    parsed = json.loads(value)
-                except json.JSONDecodeError as exc:
-                    raise ValueError(f"Cannot interpret '{value}' as array: {exc}")
-                if not isinstance(parsed, list):
-                    raise ValueError("Expected a list for array argument")
-                arr = parsed
-            else:
-                raise ValueError("Expected a list for array argument")
-
-            # Validate and coerce array items if items schema is provided
-            if items:
-                item_type = items.get("type", "string")
-                item_items = items.get("items")
-                item_properties = items.get("properties")
-                coerced_arr = []
-                for idx, item in enumerate(arr):
-                    try:
-                        coerced_item = self._coerce_argument_value(
-                            item_type, item, item_items, item_properties
-                        )
-                        coerced_arr.append(coerced_item)
-                    except (ValueError, TypeError) as exc:
-                        raise ValueError(
-                            f"Array item at index {idx} is invalid: {exc}"
-                        )
-                return coerced_arr
-            return arr
-
-        if arg_type == "object":
-            if isinstance(value, dict):
-                obj = value
-            elif isinstance(value, str):
-                try:
-                    parsed = json.loads(value)
-                except json.JSONDecodeError as exc:
-                    raise ValueError(f"Cannot interpret '{value}' as object: {exc}")
-                if not isinstance(parsed, dict):
-                    raise ValueError("Expected a mapping for object argument")
-                obj = parsed
-            else:
-                raise ValueError("Expected a mapping for object argument")
-
-            # Validate and coerce object properties if properties schema is provided
-            if properties:
-                coerced_obj = {}
-                for prop_name, prop_schema in properties.items():
-                    if prop_name in obj:
-                        prop_type = prop_schema.get("type", "string")
-                        prop_items = prop_schema.get("items")
-                        prop_properties = prop_schema.get("properties")
-                        try:
-                            coerced_value = self._coerce_argument_value(
-                                prop_type, obj[prop_name], prop_items, prop_properties
-                            )
-                            coerced_obj[prop_name] = coerced_value
-                        except (ValueError, TypeError) as exc:
-                            raise ValueError(
-                                f"Object property '{prop_name}' is invalid: {exc}"
-                            )
-                    elif prop_schema.get("required", False):
-                        raise ValueError(
-                            f"Object is missing required property '{prop_name}'"
-                        )
-                # Preserve additional properties not in schema
-                for key, val in obj.items():
-                    if key not in coerced_obj:
-                        coerced_obj[key] = val
-                return coerced_obj
-            return obj
-
-        # Fallback: pass through as-is
-        return value
+        Override to customize coercion of top-level argument values. Nested
+        array items and object properties are coerced by the compiled
+        coercer that the default implementation uses.
+        """
+        return self._cached_coercer(arg_type, items, properties)(value)
+
+    def _cached_coercer(
+        self,
+        arg_type: Optional[str],
+        items: Optional[Dict[str, Any]],
+        properties: Optional[Dict[str, Any]],
+    ) -> Coercer:
+        """Return the compiled coercer for a schema, reusing earlier compiles.
+
+        Schemas are keyed by the identity of their nested dicts. Each entry
+        keeps those dicts alive so the ids can't be recycled, and a hit is
+        confirmed by identity before it's used.
+        """
+        max_length = self.max_json_argument_length
+        key = (arg_type, id(items), id(properties), max_length)
+        entry = self._coercer_cache.get(key)
+        if entry is not None and entry[0] is items and entry[1] is properties:
+            return entry[2]
+
+        coercer = compile_coercer(arg_type, items, properties, max_json_length=max_length)
+        if len(self._coercer_cache) >= _COERCER_CACHE_SIZE:
+            # Callers passing fresh schema dicts each time would otherwise
+            # grow the cache without bound.
+            self._coercer_cache.clear()
+        self._coercer_cache[key] = (items, properties, coercer)
+        return coercer
 
     def _handle_shutdown(self):
         """Handle shutdown signal"""
@@ -863,43 +995,62 @@ class OpperatorAgent(ABC):
 
     def _handle_lifecycle_event(self, event: LifecycleEventMessage):
         """Handle lifecycle event from manager"""
-        event_type = event.event_type
-        data = event.data or {}
+        handler = self._LIFECYCLE_DISPATCH.get(event.event_type)
+        if handler is None:
+            return
 
         try:
-            if event_type == "new_conversation":
-                self.on_new_conversation(
-                    data.get("conversation_id", ""),
-                    data.get("is_clear", False)
-                )
-            elif event_type == "conversation_switched":
-                self.on_conversation_switched(
-                    data.get("conversation_id", ""),
-                    data.get("previous_id", ""),
-                    data.get("message_count", 0)
-                )
-            elif event_type == "conversation_deleted":
-                self.on_conversation_deleted(data.get("conversation_id", ""))
-            elif event_type == "agent_activated":
-                self.on_agent_activated(
-                    data.get("previous_agent"),
-                    data.get("conversation_id", "")
-                )
-            elif event_type == "agent_deactivated":
-                self.on_agent_deactivated(data.get("next_agent"))
-            elif event_type == "invocation_directory_changed":
-                # Store the new invocation directory
-                new_path = data.get("new_path", "")
-                if new_path:
-                    self._invocation_dir = new_path
-                # Call the hook
-                self.on_invocation_directory_changed(
-                    data.get("old_path", ""),
-                    new_path
-                )
+            handler(self, event.data or {})
         except Exception as exc:
             self.log(LogLevel.ERROR, f"Lifecycle event handler failed: {exc}")
 
+    # Adapters from lifecycle event payloads to the public hooks
+
+    def _on_new_conversation_event(self, data: Dict[str, Any]) -> None:
+        self.on_new_conversation(
+            data.get("conversation_id", ""),
+            data.get("is_clear", False)
+        )
+
+    def _on_conversation_switched_event(self, data: Dict[str, Any]) -> None:
+        self.on_conversation_switched(
+            data.get("conversation_id", ""),
+            data.get("previous_id", ""),
+            data.get("message_count", 0)
+        )
+
+    def _on_conversation_deleted_event(self, data: Dict[str, Any]) -> None:
+        self.on_conversation_deleted(data.get("conversation_id", ""))
+
+    def _on_agent_activated_event(self, data: Dict[str, Any]) -> None:
+        self.on_agent_activated(
+            data.get("previous_agent"),
+            data.get("conversation_id", "")
+        )
+
+    def _on_agent_deactivated_event(self, data: Dict[str, Any]) -> None:
+        self.on_agent_deactivated(data.get("next_agent"))
+
+    def _on_invocation_directory_changed_event(self, data: Dict[str, Any]) -> None:
+        # Store the new invocation directory
+        new_path = data.get("new_path", "")
+        if new_path:
+            self._invocation_dir = new_path
+        # Call the hook
+        self.on_invocation_directory_changed(
+            data.get("old_path", ""),
+            new_path
+        )
+
+    _LIFECYCLE_DISPATCH: Dict[str, Callable[["OpperatorAgent", Dict[str, Any]], None]] = {
+        "new_conversation": _on_new_conversation_event,
+        "conversation_switched": _on_conversation_switched_event,
+        "conversation_deleted": _on_conversation_deleted_event,
+        "agent_activated": _on_agent_activated_event,
+        "agent_deactivated": _on_agent_deactivated_event,
+        "invocation_directory_changed": _on_invocation_directory_changed_event,
+    }
+
     def run(self):
         """Main entry point for the process"""
         try:
@@ -939,10 +1090,11 @@ class OpperatorAgent(ABC):
             self.log(LogLevel.INFO, "Received keyboard interrupt")
             self._handle_shutdown()
         except Exception as e:
-            self.log(
-                LogLevel.FATAL, f"Fatal error: {e}", traceback=traceback.format_exc()
-            )
-            Protocol.send_error(str(e), code=1, details=traceback.format_exc())
+            error = str(e)
+            details = traceback.format_exc()
+            with Protocol.batch():
+                self.log(LogLevel.FATAL, f"Fatal error: {error}", traceback=details)
+                Protocol.send_error(error, code=1, details=details)
             sys.exit(1)
         finally:
             self.running = False
@@ -956,13 +1108,17 @@ class OpperatorAgent(ABC):
     def load_config(self):
         """Load configuration - override to implement"""
         config_file = os.environ.get("CONFIG_FILE", "config.json")
-        if os.path.exists(config_file):
-            try:
-                with open(config_file) as f:
-                    self.config = json.load(f)
-                self.log(LogLevel.INFO, f"Loaded configuration from {config_file}")
-            except Exception as e:
-                self.log(LogLevel.WARNING, f"Failed to load config: {e}")
+        try:
+            # Open directly rather than checking os.path.exists first: one
+            # syscall, and no window for the file to vanish in between.
+            with open(config_file, "rb") as f:
+                self.config = json.loads(f.read())
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            self.log(LogLevel.WARNING, f"Failed to load config: {e}")
+            return
+        self.log(LogLevel.INFO, f"Loaded configuration from {config_file}")
 
     def reload_config(self):
         """Reload configuration"""
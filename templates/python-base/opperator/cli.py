@@ -2,12 +2,16 @@
 
 import subprocess
 import json
+import os
+import selectors
 import sys
 import shutil
-from typing import Optional, Callable, Dict, Any, List
-from dataclasses import dataclass
+from typing import Optional, Callable, Dict, Any, List, Tuple
+from dataclasses import dataclass, fields
 from enum import Enum
 
+from .protocol import iter_fd_lines
+
 
 class AgentInvocationError(Exception):
     """Base exception for agent invocation errors."""
@@ -24,19 +28,39 @@ class DaemonNotRunningError(AgentInvocationError):
     pass
 
 
+# (PATH value, resolved binary) from the last successful lookup
+_OP_PATH_CACHE: Optional[Tuple[Optional[str], str]] = None
+
+
+def _reset_op_path_cache() -> None:
+    """Forget the cached op binary location."""
+    global _OP_PATH_CACHE
+    _OP_PATH_CACHE = None
+
+
 def _find_op_binary() -> str:
     """Find the op binary path in system PATH.
 
+    The result is cached per process and reused while PATH is unchanged, so
+    repeated calls don't rescan every PATH directory.
+
     Returns:
         Path to op binary
 
     Raises:
         FileNotFoundError: If op or opperator binary not found in PATH
     """
+    global _OP_PATH_CACHE
+    search_path = os.environ.get("PATH")
+    cached = _OP_PATH_CACHE
+    if cached is not None and cached[0] == search_path:
+        return cached[1]
+
     # Try both 'op' and 'opperator' in system PATH
     for binary_name in ["op", "opperator"]:
-        op_path = shutil.which(binary_name)
+        op_path = shutil.which(binary_name, path=search_path)
         if op_path:
+            _OP_PATH_CACHE = (search_path, op_path)
             return op_path
 
     raise FileNotFoundError(
@@ -91,6 +115,13 @@ class AgentType(str, Enum):
     MANAGED = "managed"
 
 
+# Value -> member tables for decoding streamed events. Values this SDK
+# doesn't know yet (e.g. from a newer op binary) are kept as plain strings.
+_EVENT_TYPES: Dict[str, EventType] = {member.value: member for member in EventType}
+_ITEM_TYPES: Dict[str, ItemType] = {member.value: member for member in ItemType}
+_AGENT_TYPES: Dict[str, AgentType] = {member.value: member for member in AgentType}
+
+
 @dataclass
 class Item:
     """Represents an item in an event (agent message, tool call, or sub-agent)."""
@@ -111,64 +142,52 @@ class Item:
     depth: Optional[int] = None
 
 
-@dataclass
-class ExecEvent:
-    """Represents a JSON event from op exec."""
-    type: EventType
-    session_id: str
-    raw: Dict[str, Any]
+# Item fields copied as-is from the raw item; id, type and status get defaults
+_ITEM_OPTIONAL_FIELDS = tuple(
+    f.name for f in fields(Item) if f.name not in {"id", "type", "status"}
+)
 
-    # Session events
-    conversation_title: Optional[str] = None
-    agent_name: Optional[str] = None
-    agent_type: Optional[AgentType] = None
-    is_resumed: Optional[bool] = None
-    has_history: Optional[bool] = None
-    message_count: Optional[int] = None
-    final_response: Optional[str] = None
-    total_turns: Optional[int] = None
-    total_tool_calls: Optional[int] = None
-    duration_ms: Optional[int] = None
-    error: Optional[str] = None
-    error_type: Optional[str] = None
 
+# Event fields that are read straight from the raw event when accessed
+_RAW_EVENT_FIELDS = frozenset({
+    # Session events
+    "conversation_title", "agent_name", "is_resumed", "has_history",
+    "message_count", "final_response", "total_turns", "total_tool_calls",
+    "duration_ms", "error", "error_type",
     # Turn events
-    turn_number: Optional[int] = None
-    round_count: Optional[int] = None
-    has_tool_calls: Optional[bool] = None
+    "turn_number", "round_count", "has_tool_calls",
+    # Sub-agent events
+    "subagent_id", "parent_item_id", "task_definition", "prompt", "result",
+    "transcript", "metadata",
+    # Async task events
+    "task_id", "call_id", "tool_name", "command_name", "command_args",
+    "status", "daemon", "working_dir", "context", "created_at", "updated_at",
+    "completed_at", "progress_count", "progress_summary",
+    # Command progress
+    "item_id", "command_id", "progress",
+})
 
-    # Item events
-    item: Optional[Item] = None
 
-    # Sub-agent events
-    subagent_id: Optional[str] = None
-    parent_item_id: Optional[str] = None
-    task_definition: Optional[str] = None
-    prompt: Optional[str] = None
-    result: Optional[str] = None
-    transcript: Optional[List[Dict[str, Any]]] = None
-    metadata: Optional[Dict[str, Any]] = None
+@dataclass(slots=True)
+class ExecEvent:
+    """Represents a JSON event from op exec.
 
-    # Async task events
-    task_id: Optional[str] = None
-    call_id: Optional[str] = None
-    tool_name: Optional[str] = None
-    command_name: Optional[str] = None
-    command_args: Optional[str] = None
-    status: Optional[str] = None
-    daemon: Optional[str] = None
-    working_dir: Optional[str] = None
-    context: Optional[Dict[str, Any]] = None
-    created_at: Optional[str] = None
-    updated_at: Optional[str] = None
-    completed_at: Optional[str] = None
-    progress_count: Optional[int] = None
-    progress_summary: Optional[List[Dict[str, Any]]] = None
+    Only the typed fields are stored. Every other event field (for example
+    ``final_response``, ``turn_number``, ``task_id`` or ``progress``) is
+    looked up in ``raw`` when accessed, returning None if absent.
+    """
+    type: EventType
+    session_id: str
+    raw: Dict[str, Any]
+    item: Optional[Item] = None
+    agent_type: Optional[AgentType] = None
 
-    # Command progress
-    item_id: Optional[str] = None
-    command_id: Optional[str] = None
-    progress: Optional[Dict[str, Any]] = None
+    def __getattr__(self, name: str) -> Any:
+        if name in _RAW_EVENT_FIELDS:
+            return self.raw.get(name)
+        raise AttributeError(
+            f"{type(self).__name__!r} object has no attribute {name!r}"
+        )
 
 
 @dataclass
@@ -259,26 +278,25 @@ class ExecClient:
         if no_save:
             cmd.append("--no-save")
 
-        # Run command
+        # Run command. Output is read as bytes: json.loads decodes UTF-8
+        # input itself, so event lines skip the text layer's decode step.
         process = subprocess.Popen(
             cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1
+            bufsize=0,
         )
 
         events: List[ExecEvent] = []
         resume_id: Optional[str] = None
         final_response: Optional[str] = None
 
-        # Read output line by line
-        for line in iter(process.stdout.readline, ''):
-            if not line:
-                break
-
-            line = line.strip()
-            if not line:
+        # Read output line by line, splitting large os.read chunks instead of
+        # issuing one readline call per event
+        for line in iter_fd_lines(process.stdout.fileno()):
+            # json.loads accepts the surrounding whitespace (including the
+            # newline and any \r), so lines are only stripped for stderr.
+            if line.isspace():
                 continue
 
             # Try to parse as JSON event
@@ -299,9 +317,9 @@ class ExecClient:
                 if event_callback:
                     event_callback(event)
 
-            except json.JSONDecodeError:
+            except (json.JSONDecodeError, UnicodeDecodeError):
                 # Not JSON - pass through to stderr
-                print(line, file=sys.stderr, flush=True)
+                print(line.strip().decode("utf-8", errors="replace"), file=sys.stderr, flush=True)
 
         # Wait for process to complete
         return_code = process.wait()
@@ -325,89 +343,78 @@ class ExecClient:
 
     def _parse_event(self, raw: Dict[str, Any]) -> ExecEvent:
         """Parse raw JSON event into typed ExecEvent."""
-        event_type = EventType(raw.get("type", ""))
+        raw_type = raw.get("type", "")
+        event_type = _EVENT_TYPES.get(raw_type, raw_type)
         session_id = raw.get("session_id", "")
 
         # Parse item if present
         item = None
         if "item" in raw:
             item_data = raw["item"]
+            raw_item_type = item_data.get("type", "")
             item = Item(
                 id=item_data.get("id", ""),
-                type=ItemType(item_data.get("type", "")),
+                type=_ITEM_TYPES.get(raw_item_type, raw_item_type),
                 status=item_data.get("status", ""),
-                text=item_data.get("text"),
-                name=item_data.get("name"),
-                display_name=item_data.get("display_name"),
-                arguments=item_data.get("arguments"),
-                output=item_data.get("output"),
-                error=item_data.get("error"),
-                duration_ms=item_data.get("duration_ms"),
-                exit_code=item_data.get("exit_code"),
-                agent_name=item_data.get("agent_name"),
-                prompt=item_data.get("prompt"),
-                result=item_data.get("result"),
-                depth=item_data.get("depth")
+                **{name: item_data.get(name) for name in _ITEM_OPTIONAL_FIELDS},
             )
 
         # Parse agent_type if present
         agent_type = None
         if "agent_type" in raw:
-            agent_type = AgentType(raw["agent_type"])
+            raw_agent_type = raw["agent_type"]
+            agent_type = _AGENT_TYPES.get(raw_agent_type, raw_agent_type)
 
         return ExecEvent(
             type=event_type,
             session_id=session_id,
             raw=raw,
-            # Session events
-            conversation_title=raw.get("conversation_title"),
-            agent_name=raw.get("agent_name"),
-            agent_type=agent_type,
-            is_resumed=raw.get("is_resumed"),
-            has_history=raw.get("has_history"),
-            message_count=raw.get("message_count"),
-            final_response=raw.get("final_response"),
-            total_turns=raw.get("total_turns"),
-            total_tool_calls=raw.get("total_tool_calls"),
-            duration_ms=raw.get("duration_ms"),
-            error=raw.get("error"),
-            error_type=raw.get("error_type"),
-            # Turn events
-            turn_number=raw.get("turn_number"),
-            round_count=raw.get("round_count"),
-            has_tool_calls=raw.get("has_tool_calls"),
-            # Item events
             item=item,
-            # Sub-agent events
-            subagent_id=raw.get("subagent_id"),
-            parent_item_id=raw.get("parent_item_id"),
-            task_definition=raw.get("task_definition"),
-            prompt=raw.get("prompt"),
-            result=raw.get("result"),
-            transcript=raw.get("transcript"),
-            metadata=raw.get("metadata"),
-            # Async task events
-            task_id=raw.get("task_id"),
-            call_id=raw.get("call_id"),
-            tool_name=raw.get("tool_name"),
-            command_name=raw.get("command_name"),
-            command_args=raw.get("command_args"),
-            status=raw.get("status"),
-            daemon=raw.get("daemon"),
-            working_dir=raw.get("working_dir"),
-            context=raw.get("context"),
-            created_at=raw.get("created_at"),
-            updated_at=raw.get("updated_at"),
-            completed_at=raw.get("completed_at"),
-            progress_count=raw.get("progress_count"),
-            progress_summary=raw.get("progress_summary"),
-            # Command progress
-            item_id=raw.get("item_id"),
-            command_id=raw.get("command_id"),
-            progress=raw.get("progress")
+            agent_type=agent_type,
         )
 
 
+def _drain_process(
+    process: subprocess.Popen,
+    on_stderr_line: Optional[Callable[[bytes], None]] = None,
+    chunk_size: int = 65536,
+) -> Tuple[bytes, bytes]:
+    """Read a process's stdout and stderr pipes to EOF without blocking on either.
+
+    Both pipes are multiplexed with a selector, so a child that fills one
+    pipe while we wait on the other can't deadlock. ``on_stderr_line`` is
+    called with each stderr line (newline included) as soon as it is
+    complete.
+    """
+    stdout_buf = bytearray()
+    stderr_buf = bytearray()
+    line_start = 0
+
+    with selectors.DefaultSelector() as selector:
+        selector.register(process.stdout, selectors.EVENT_READ, stdout_buf)
+        selector.register(process.stderr, selectors.EVENT_READ, stderr_buf)
+        while selector.get_map():
+            for key, _ in selector.select():
+                chunk = os.read(key.fd, chunk_size)
+                if not chunk:
+                    selector.unregister(key.fileobj)
+                    continue
+                key.data.extend(chunk)
+                if on_stderr_line is None or key.data is not stderr_buf:
+                    continue
+                end = stderr_buf.find(b"\n", line_start)
+                while end != -1:
+                    on_stderr_line(bytes(stderr_buf[line_start:end + 1]))
+                    line_start = end + 1
+                    end = stderr_buf.find(b"\n", line_start)
+
+    if on_stderr_line is not None and line_start < len(stderr_buf):
+        on_stderr_line(bytes(stderr_buf[line_start:]))
+    process.stdout.close()
+    process.stderr.close()
+    return bytes(stdout_buf), bytes(stderr_buf)
+
+
 @dataclass
 class CommandResult:
     """Result of a command invocation."""
@@ -466,27 +473,29 @@ def command(
             cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True
+            bufsize=0,
+        )
+
+        # Drain stdout and stderr together, reporting progress from stderr
+        # as lines arrive
+        stderr_lines: List[str] = []
+
+        def on_stderr_line(raw_line: bytes) -> None:
+            line = raw_line.decode("utf-8", errors="replace").strip()
+            if line:
+                stderr_lines.append(line)
+                if not line.startswith("{"):  # Not JSON
+                    progress_callback(line)
+
+        stdout_bytes, stderr_bytes = _drain_process(
+            process, on_stderr_line if progress_callback else None
         )
+        stdout = stdout_bytes.decode("utf-8", errors="replace")
+        if not progress_callback and stderr_bytes:
+            stderr_text = stderr_bytes.decode("utf-8", errors="replace")
+            stderr_lines.extend(stderr_text.strip().split('\n'))
 
-        # Read stderr for progress updates
-        stderr_lines = []
-        if progress_callback:
-            for line in iter(process.stderr.readline, ''):
-                if not line:
-                    break
-                line = line.strip()
-                if line:
-                    stderr_lines.append(line)
-                    if not line.startswith("{"):  # Not JSON
-                        progress_callback(line)
-
-        # Get stdout and wait for completion
-        stdout, stderr_rest = process.communicate()
-        if stderr_rest:
-            stderr_lines.extend(stderr_rest.strip().split('\n'))
-
-        return_code = process.returncode
+        return_code = process.wait()
 
         if return_code != 0:
             error_output = '\n'.join(stderr_lines) if stderr_lines else stdout
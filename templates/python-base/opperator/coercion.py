@@ -0,0 +1,339 @@
+"""Argument coercion for command schemas.
+
+Schemas are compiled once into coercion functions so validating a command's
+arguments doesn't re-interpret the schema on every invocation.
+"""
+
+import json
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+Coercer = Callable[[Any], Any]
+
+_TRUE_STRINGS = frozenset({"true", "1", "yes", "on"})
+_FALSE_STRINGS = frozenset({"false", "0", "no", "off"})
+_BOOLEAN_LITERALS: Dict[str, bool] = {
+    **{form: True for word in _TRUE_STRINGS for form in (word, word.title(), word.upper())},
+    **{form: False for word in _FALSE_STRINGS for form in (word, word.title(), word.upper())},
+}
+
+
+# Each scalar coercer first returns values that already have the exact target
+# type, then handles the other exact JSON types with identity checks. The
+# isinstance ladder at the end only runs for subclasses and other objects.
+
+
+def _coerce_string(value: Any) -> Any:
+    if type(value) is str:
+        return value
+    if value is None:
+        return None
+    return str(value)
+
+
+def _coerce_integer(value: Any) -> Any:
+    value_type = type(value)
+    if value_type is int:
+        return value
+    if value is None:
+        return None
+    if value_type is str:
+        return int(value.strip(), 10)
+    if value_type is float:
+        return int(value)
+    if value_type is bool:
+        raise ValueError("Boolean value is not valid for integer argument")
+    if isinstance(value, bool):
+        raise ValueError("Boolean value is not valid for integer argument")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        stripped = value.strip()
+        return int(stripped, 10)
+    return int(value)
+
+
+def _coerce_number(value: Any) -> Any:
+    value_type = type(value)
+    if value_type is float:
+        return value
+    if value is None:
+        return None
+    if value_type is int:
+        return float(value)
+    if value_type is str:
+        return float(value.strip())
+    if value_type is bool:
+        raise ValueError("Boolean value is not valid for number argument")
+    if isinstance(value, bool):
+        raise ValueError("Boolean value is not valid for number argument")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        stripped = value.strip()
+        return float(stripped)
+    return float(value)
+
+
+def _coerce_boolean(value: Any) -> Any:
+    value_type = type(value)
+    if value_type is bool:
+        return value
+    if value is None:
+        return None
+    if value_type is int or value_type is float:
+        return bool(value)
+    if isinstance(value, str):
+        # Well-formed input hits the literal table without building the
+        # stripped/lowered copies.
+        literal = _BOOLEAN_LITERALS.get(value)
+        if literal is not None:
+            return literal
+        lowered = value.strip().lower()
+        if lowered in _TRUE_STRINGS:
+            return True
+        if lowered in _FALSE_STRINGS:
+            return False
+        raise ValueError(f"Cannot interpret '{value}' as boolean")
+    if isinstance(value, (int, float)):
+        return bool(value)
+    raise ValueError(f"Cannot interpret '{value}' as boolean")
+
+
+def _passthrough(value: Any) -> Any:
+    return value
+
+
+_SCALAR_COERCERS: Dict[str, Coercer] = {
+    "string": _coerce_string,
+    "integer": _coerce_integer,
+    "number": _coerce_number,
+    "boolean": _coerce_boolean,
+}
+
+
+# The exact type each scalar coercer returns unchanged
+_PASSTHROUGH_TYPES: Dict[Coercer, type] = {
+    _coerce_string: str,
+    _coerce_integer: int,
+    _coerce_number: float,
+    _coerce_boolean: bool,
+}
+
+
+# Builtins that convert a whole array in one C-level map() when every item
+# has the given type, giving the same result as the scalar coercer per item
+_BULK_CONVERSIONS: Dict[Tuple[Coercer, type], Callable[[Any], Any]] = {
+    (_coerce_integer, str): int,
+    (_coerce_number, str): float,
+    (_coerce_number, int): float,
+}
+
+
+def _check_json_length(value: str, max_length: Optional[int]) -> None:
+    if max_length is not None and len(value) > max_length:
+        raise ValueError(
+            f"JSON argument is {len(value)} characters; the limit is {max_length}"
+        )
+
+
+_MAX_REPORTED_ITEM_ERRORS = 10
+
+# Errors a coercer can raise for a bad value. OverflowError comes from int()
+# on an infinite float, such as a JSON 1e400 passed for an integer.
+_COERCION_ERRORS = (ValueError, TypeError, OverflowError)
+
+
+def _array_items_error(failures: List[Tuple[int, Exception]]) -> ValueError:
+    idx, exc = failures[0]
+    if len(failures) == 1:
+        return ValueError(f"Array item at index {idx} is invalid: {exc}")
+    shown = "; ".join(
+        f"index {idx}: {exc}" for idx, exc in failures[:_MAX_REPORTED_ITEM_ERRORS]
+    )
+    hidden = len(failures) - _MAX_REPORTED_ITEM_ERRORS
+    if hidden > 0:
+        shown += f"; and {hidden} more"
+    return ValueError(f"{len(failures)} array items are invalid: {shown}")
+
+
+def _compile_array(items: Optional[Dict[str, Any]], max_length: Optional[int]) -> Coercer:
+    item_coercer: Optional[Coercer] = None
+    if items:
+        item_coercer = compile_coercer(
+            items.get("type", "string"),
+            items.get("items"),
+            items.get("properties"),
+            max_json_length=max_length,
+        )
+    # Items of this exact type are returned as-is by the item coercer
+    exact_type = _PASSTHROUGH_TYPES.get(item_coercer) if item_coercer is not None else None
+    passthrough = {exact_type} if exact_type is not None else None
+    bulk_conversions = {
+        item_type: convert
+        for (coercer, item_type), convert in _BULK_CONVERSIONS.items()
+        if coercer is item_coercer
+    }
+
+    def coerce_array(value: Any) -> Any:
+        if value is None:
+            return None
+        if isinstance(value, list):
+            arr = value
+        elif isinstance(value, str):
+            _check_json_length(value, max_length)
+            try:
+                parsed = json.loads(value)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"Cannot interpret '{value}' as array: {exc}")
+            if not isinstance(parsed, list):
+                raise ValueError("Expected a list for array argument")
+            arr = parsed
+        else:
+            raise ValueError("Expected a list for array argument")
+
+        if item_coercer is None:
+            return arr
+        if passthrough is not None:
+            item_types = set(map(type, arr))
+            if item_types == passthrough:
+                # Already well typed: nothing to copy or convert
+                return arr
+            if len(item_types) == 1 and bulk_conversions:
+                convert = bulk_conversions.get(item_types.pop())
+                if convert is not None:
+                    try:
+                        return list(map(convert, arr))
+                    except _COERCION_ERRORS:
+                        # Report the failing item through the path below
+                        pass
+
+        try:
+            if exact_type is not None:
+                # Mixed input: only call the coercer for items that need it
+                return [
+                    item if type(item) is exact_type else item_coercer(item)
+                    for item in arr
+                ]
+            return [item_coercer(item) for item in arr]
+        except _COERCION_ERRORS:
+            # Coercers are pure, so re-run item by item to report every
+            # failing index in one error.
+            failures = []
+            for idx, item in enumerate(arr):
+                try:
+                    item_coercer(item)
+                except _COERCION_ERRORS as exc:
+                    failures.append((idx, exc))
+            if not failures:
+                raise
+            raise _array_items_error(failures) from None
+
+    return coerce_array
+
+
+def _compile_object(
+    properties: Optional[Dict[str, Any]], max_length: Optional[int]
+) -> Coercer:
+    prop_plan = None
+    # Required property names in schema order, and as a set for the check
+    required_order: Tuple[str, ...] = ()
+    required_keys: FrozenSet[str] = frozenset()
+    if properties:
+        prop_plan = tuple(
+            (
+                prop_name,
+                compile_coercer(
+                    prop_schema.get("type", "string"),
+                    prop_schema.get("items"),
+                    prop_schema.get("properties"),
+                    max_json_length=max_length,
+                ),
+            )
+            for prop_name, prop_schema in properties.items()
+        )
+        required_order = tuple(
+            prop_name
+            for prop_name, prop_schema in properties.items()
+            if prop_schema.get("required", False)
+        )
+        required_keys = frozenset(required_order)
+
+    def coerce_object(value: Any) -> Any:
+        if value is None:
+            return None
+        if isinstance(value, dict):
+            obj = value
+        elif isinstance(value, str):
+            _check_json_length(value, max_length)
+            try:
+                parsed = json.loads(value)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"Cannot interpret '{value}' as object: {exc}")
+            if not isinstance(parsed, dict):
+                raise ValueError("Expected a mapping for object argument")
+            obj = parsed
+        else:
+            raise ValueError("Expected a mapping for object argument")
+
+        if prop_plan is None:
+            return obj
+
+        if required_keys and not required_keys <= obj.keys():
+            missing = [name for name in required_order if name not in obj]
+            if len(missing) == 1:
+                raise ValueError(f"Object is missing required property '{missing[0]}'")
+            names = ", ".join(f"'{name}'" for name in missing)
+            raise ValueError(f"Object is missing required properties {names}")
+
+        # The object is copied only once a property's coerced value differs
+        # from the original; properties not in the schema are preserved.
+        coerced_obj = None
+        for prop_name, coercer in prop_plan:
+            if prop_name in obj:
+                original = obj[prop_name]
+                try:
+                    coerced = coercer(original)
+                except _COERCION_ERRORS as exc:
+                    raise ValueError(f"Object property '{prop_name}' is invalid: {exc}")
+                if coerced is not original:
+                    if coerced_obj is None:
+                        coerced_obj = dict(obj)
+                    coerced_obj[prop_name] = coerced
+        return obj if coerced_obj is None else coerced_obj
+
+    return coerce_object
+
+
+def compile_coercer(
+    arg_type: Optional[str],
+    items: Optional[Dict[str, Any]] = None,
+    properties: Optional[Dict[str, Any]] = None,
+    *,
+    max_json_length: Optional[int] = None,
+) -> Coercer:
+    """Compile a JSON-schema style type description into a coercion function.
+
+    The returned function converts a raw value to the schema type, returns
+    None for None, and raises ValueError when the value can't be coerced.
+    Nested ``items``/``properties`` schemas are compiled up front.
+
+    Array and object values passed as JSON strings longer than
+    ``max_json_length`` characters are rejected before parsing.
+    """
+    arg_type = str(arg_type or "string").lower()
+
+    scalar = _SCALAR_COERCERS.get(arg_type)
+    if scalar is not None:
+        return scalar
+    if arg_type == "array":
+        return _compile_array(items, max_json_length)
+    if arg_type == "object":
+        return _compile_object(properties, max_json_length)
+
+    # Fallback: pass through as-is
+    return _passthrough
+
+
+__all__ = ["Coercer", "compile_coercer"]
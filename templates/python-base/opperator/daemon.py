@@ -0,0 +1,178 @@
+"""Shared connections to the Opperator daemon's Unix socket.
+
+The daemon serves any number of newline-delimited JSON requests on a single
+connection, so sockets are kept open and reused across requests instead of
+connecting and closing each time.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import tempfile
+import threading
+import time
+from typing import Final, List, Optional
+
+DEFAULT_SOCKET_NAME: Final[str] = "opperator.sock"
+ENV_SOCKET_PATH: Final[str] = "OPPERATOR_SOCKET_PATH"
+
+
+# Socket path resolved on first use
+_SOCKET_PATH: Optional[str] = None
+
+
+def _reset_socket_path_cache() -> None:
+    """Forget the cached socket path so the next request resolves it again."""
+    global _SOCKET_PATH
+    _SOCKET_PATH = None
+
+
+def resolve_socket_path() -> str:
+    """Return the daemon socket path.
+
+    The path comes from ``OPPERATOR_SOCKET_PATH`` or defaults to the system
+    temp directory. It is resolved once per process and then reused.
+    """
+    global _SOCKET_PATH
+    path = _SOCKET_PATH
+    if path is None:
+        path = os.environ.get(ENV_SOCKET_PATH) or os.path.join(
+            tempfile.gettempdir(), DEFAULT_SOCKET_NAME
+        )
+        _SOCKET_PATH = path
+    return path
+
+
+class DaemonConnection:
+    """A small pool of reusable connections to the daemon.
+
+    Each request checks out an idle socket, or opens a new one when none is
+    free, so concurrent requests don't wait behind each other. A socket goes
+    back to the pool only after a clean exchange; one that failed, or that
+    holds unread bytes, is closed. The pool is emptied when the path changes
+    or after a fork.
+    """
+
+    def __init__(self, bufsize: int = 4096, max_idle: int = 4):
+        self._bufsize = bufsize
+        self._max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle: List[socket.socket] = []
+        self._path: Optional[str] = None
+        self._pid: Optional[int] = None
+
+    def request(self, raw: bytes, timeout: float) -> bytes:
+        """Send one newline-terminated request and return the reply line.
+
+        The returned bytes exclude the trailing newline. *timeout* bounds the
+        whole call, including a retry. Raises OSError if the daemon can't be
+        reached or doesn't reply in time.
+        """
+        deadline = time.monotonic() + timeout
+        path = resolve_socket_path()
+        sock = self._checkout(path)
+        if sock is not None:
+            try:
+                return self._exchange(path, sock, raw, deadline)
+            except OSError:
+                # The daemon may have dropped an idle connection; retry once
+                # on a fresh socket with whatever is left of the timeout.
+                pass
+        return self._exchange(path, self._connect(path, deadline), raw, deadline)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for sock in idle:
+            _close_quietly(sock)
+
+    def _checkout(self, path: str) -> Optional[socket.socket]:
+        pid = os.getpid()
+        stale: List[socket.socket] = []
+        with self._lock:
+            if self._path != path or self._pid != pid:
+                stale, self._idle = self._idle, []
+                self._path = path
+                self._pid = pid
+            sock = self._idle.pop() if self._idle else None
+        for old in stale:
+            _close_quietly(old)
+        return sock
+
+    def _checkin(self, path: str, sock: socket.socket) -> None:
+        with self._lock:
+            if (
+                self._path == path
+                and self._pid == os.getpid()
+                and len(self._idle) < self._max_idle
+            ):
+                self._idle.append(sock)
+                return
+        _close_quietly(sock)
+
+    @staticmethod
+    def _connect(path: str, deadline: float) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(_time_left(deadline))
+            sock.connect(path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _exchange(
+        self, path: str, sock: socket.socket, raw: bytes, deadline: float
+    ) -> bytes:
+        # Socket timeouts apply per call, so each blocking step gets only
+        # the time left before *deadline*.
+        try:
+            sock.settimeout(_time_left(deadline))
+            sock.sendall(raw)
+            parts: List[bytes] = []
+            while True:
+                sock.settimeout(_time_left(deadline))
+                chunk = sock.recv(self._bufsize)
+                if not chunk:
+                    raise ConnectionResetError("daemon closed the connection")
+                end = chunk.find(b"\n")
+                if end != -1:
+                    break
+                parts.append(chunk)
+        except OSError:
+            _close_quietly(sock)
+            raise
+
+        parts.append(chunk[:end])
+        if end + 1 == len(chunk):
+            self._checkin(path, sock)
+        else:
+            # Bytes past the reply mean the stream is out of step
+            _close_quietly(sock)
+        return b"".join(parts)
+
+
+def _time_left(deadline: float) -> float:
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("timed out waiting for the daemon")
+    return remaining
+
+
+def _close_quietly(sock: socket.socket) -> None:
+    try:
+        sock.close()
+    except OSError:
+        pass
+
+
+_connection = DaemonConnection()
+
+
+def request(raw: bytes, timeout: float) -> bytes:
+    """Send *raw* over the process-wide daemon connection."""
+    return _connection.request(raw, timeout)
+
+
+__all__ = ["DaemonConnection", "request", "resolve_socket_path"]
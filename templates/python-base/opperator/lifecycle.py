@@ -4,10 +4,13 @@ Lifecycle management for Opperator processes.
 
 import signal
 import threading
-from typing import Callable, Iterable
+from typing import Callable, Sequence
 
 from .protocol import LogLevel, Protocol
 
+# Not every platform has SIGUSR1 (e.g. Windows)
+_SIGUSR1 = getattr(signal, "SIGUSR1", None)
+
 
 class LifecycleManager:
     """Manages process lifecycle and signal handling"""
@@ -31,8 +34,8 @@ class LifecycleManager:
         signal.signal(signal.SIGHUP, self._handle_sighup)
 
         # SIGUSR1 - Report status
-        if hasattr(signal, "SIGUSR1"):
-            signal.signal(signal.SIGUSR1, self._handle_sigusr1)
+        if _SIGUSR1 is not None:
+            signal.signal(_SIGUSR1, self._handle_sigusr1)
 
         # SIGINT - Handle Ctrl+C
         signal.signal(signal.SIGINT, self._handle_sigint)
@@ -61,7 +64,8 @@ class LifecycleManager:
     def _handle_sigint(self, signum, frame):
         """Handle SIGINT (Ctrl+C) for immediate shutdown"""
         Protocol.send_log(LogLevel.INFO, "Received SIGINT, shutting down")
-        self._handle_sigterm(signum, frame)
+        self._invoke_handlers(self._shutdown_handlers, "Shutdown")
+        self._shutdown_event.set()
 
     def on_shutdown(self, handler: Callable[[], None]):
         """Register a shutdown handler"""
@@ -84,8 +88,10 @@ class LifecycleManager:
         self._handle_sigterm(signal.SIGTERM, None)
 
     def _invoke_handlers(
-        self, handlers: Iterable[Callable[[], None]], category: str
+        self, handlers: Sequence[Callable[[], None]], category: str
     ) -> None:
+        if not handlers:
+            return
         for handler in handlers:
             try:
                 handler()
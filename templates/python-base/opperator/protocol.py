@@ -1,12 +1,97 @@
 """Protocol definitions for communication with Opperator process manager."""
 
 import json
+import os
 import re
 import sys
-from dataclasses import dataclass, asdict, replace
-from datetime import datetime, timezone
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
 from enum import Enum
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, TypeVar, Union
+
+
+# One shared encoder for every outgoing message, so all payloads are
+# serialized with the same settings.
+_encode_json = json.JSONEncoder().encode
+
+# Lines held back by Protocol.batch() on the current thread, or None
+_batch_state = threading.local()
+
+# (epoch second, formatted date and time) of the last timestamp produced
+_timestamp_prefix: Tuple[int, str] = (-1, "")
+
+
+def _utcnow_iso() -> str:
+    """Return the current UTC time as ``datetime.isoformat()`` would.
+
+    The date and time-of-day part only changes once a second, so it is
+    formatted once and reused for every message sent within that second.
+    """
+    global _timestamp_prefix
+    seconds, micros = divmod(time.time_ns() // 1000, 1_000_000)
+    cached_second, prefix = _timestamp_prefix
+    if seconds != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        _timestamp_prefix = (seconds, prefix)
+    if micros:
+        return f"{prefix}.{micros:06d}+00:00"
+    return f"{prefix}+00:00"
+
+
+def _write_line(line: str) -> None:
+    """Write one newline-terminated protocol line to stdout and flush it.
+
+    The encoded line goes straight to the binary buffer in a single write,
+    skipping the text layer's codec and pending-text bookkeeping. Anything
+    already printed through the text layer is flushed first to keep output
+    in order. Streams without a buffer, like io.StringIO, are written as text.
+    Inside ``Protocol.batch()`` the line is queued instead.
+    """
+    pending = getattr(_batch_state, 'lines', None)
+    if pending is not None:
+        pending.append(line)
+        return
+    stdout = sys.stdout
+    buffer = getattr(stdout, 'buffer', None)
+    if buffer is None:
+        stdout.write(line)
+        stdout.flush()
+        return
+    stdout.flush()
+    buffer.write(line.encode('utf-8'))
+    buffer.flush()
+
+
+def iter_fd_lines(fd: int, chunk_size: int = 65536) -> Iterator[bytes]:
+    """Yield newline-terminated lines read from a file descriptor.
+
+    The descriptor is read with ``os.read`` in large chunks and lines are
+    split out with ``bytes.find``, so a burst of messages costs one read call
+    rather than one buffered ``readline`` per line. A final line without a
+    trailing newline is yielded at EOF.
+    """
+    partial: List[bytes] = []
+    while True:
+        chunk = os.read(fd, chunk_size)
+        if not chunk:
+            if partial:
+                yield b"".join(partial)
+            return
+        start = 0
+        end = chunk.find(b"\n")
+        while end != -1:
+            if partial:
+                partial.append(chunk[start:end + 1])
+                yield b"".join(partial)
+                partial.clear()
+            else:
+                yield chunk[start:end + 1]
+            start = end + 1
+            end = chunk.find(b"\n", start)
+        if start < len(chunk):
+            partial.append(chunk[start:])
 
 
 class MessageType(str, Enum):
@@ -36,6 +121,14 @@ class MessageType(str, Enum):
     ERROR = "error"
 
 
+# Plain string values of the message types sent on hot paths. Looking up an
+# enum member and encoding it costs noticeably more than a module global.
+_TYPE_LOG = MessageType.LOG.value
+_TYPE_ERROR = MessageType.ERROR.value
+_TYPE_RESPONSE = MessageType.RESPONSE.value
+_TYPE_COMMAND_PROGRESS = MessageType.COMMAND_PROGRESS.value
+
+
 class LogLevel(str, Enum):
     """Log severity levels"""
     DEBUG = "debug"
@@ -45,7 +138,12 @@ class LogLevel(str, Enum):
     FATAL = "fatal"
 
 
-@dataclass
+# Plain strings encode faster than str enum members. Lookups with a plain
+# level string also hit, since LogLevel members hash and compare as strings.
+_LOG_LEVEL_VALUES: Dict[str, str] = {level: level.value for level in LogLevel}
+
+
+@dataclass(slots=True)
 class Message:
     """Base message structure"""
     type: MessageType
@@ -54,34 +152,47 @@ class Message:
     
     def to_json(self) -> str:
         """Convert message to JSON string"""
-        return json.dumps({
+        return _encode_json({
             'type': self.type.value if isinstance(self.type, Enum) else self.type,
             'timestamp': self.timestamp,
             'data': self.data
         })
     
     @classmethod
-    def from_json(cls, json_str: str) -> 'Message':
-        """Create message from JSON string"""
-        data = json.loads(json_str)
+    def from_json(cls, json_str: Union[str, bytes]) -> 'Message':
+        """Create message from JSON string or UTF-8 bytes"""
+        return cls.from_dict(json.loads(json_str))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Message':
+        """Create message from an already decoded JSON object"""
+        if 'timestamp' in data:
+            timestamp = data['timestamp']
+        else:
+            timestamp = _utcnow_iso()
         return cls(
             type=MessageType(data['type']),
-            timestamp=data.get('timestamp', datetime.now(timezone.utc).isoformat()),
+            timestamp=timestamp,
             data=data.get('data')
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class ReadyMessage:
     """Sent when process is ready"""
     pid: int
     version: Optional[str] = None
     
     def to_dict(self) -> Dict[str, Any]:
-        return {k: v for k, v in asdict(self).items() if v is not None}
+        data: Dict[str, Any] = {}
+        if self.pid is not None:
+            data['pid'] = self.pid
+        if self.version is not None:
+            data['version'] = self.version
+        return data
 
 
-@dataclass
+@dataclass(slots=True)
 class LogMessage:
     """Structured log message"""
     level: LogLevel
@@ -98,7 +209,7 @@ class LogMessage:
         return data
 
 
-@dataclass
+@dataclass(slots=True)
 class LifecycleEventMessage:
     """Lifecycle event from manager to process"""
     event_type: str
@@ -106,13 +217,11 @@ class LifecycleEventMessage:
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'LifecycleEventMessage':
-        return cls(
-            event_type=data.get('event_type', ''),
-            data=data.get('data')
-        )
+        get = data.get
+        return cls(get('event_type', ''), get('data'))
 
 
-@dataclass
+@dataclass(slots=True)
 class CommandMessage:
     """Command from manager to process"""
     command: str
@@ -122,15 +231,13 @@ class CommandMessage:
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'CommandMessage':
-        return cls(
-            command=data.get('command', ''),
-            args=data.get('args'),
-            id=data.get('id'),
-            working_dir=data.get('working_dir')
-        )
+        # Runs for every command received; bind get once and pass the
+        # fields positionally, in declaration order.
+        get = data.get
+        return cls(get('command', ''), get('args'), get('id'), get('working_dir'))
 
 
-@dataclass
+@dataclass(slots=True)
 class ResponseMessage:
     """Response to a command"""
     command_id: Optional[str] = None
@@ -151,7 +258,7 @@ class ResponseMessage:
         return data
 
 
-@dataclass
+@dataclass(slots=True)
 class CommandProgress:
     """Progress update for a long-running command."""
 
@@ -190,8 +297,36 @@ class SlashCommandScope(str, Enum):
     GLOBAL = "global"
 
 
-@dataclass
-class CommandArgument:
+_T = TypeVar('_T')
+
+_VALID_ARG_TYPES = frozenset({"string", "integer", "number", "boolean", "array", "object"})
+
+
+class _CachedDictMixin:
+    """Memoizes ``to_dict()`` on frozen dataclasses.
+
+    Subclasses build their payload in ``_build_dict()``. Callers get a shallow
+    copy, so nested values must not be mutated in place after serializing.
+    Instances returned by ``normalized()`` are flagged with ``_is_normalized``
+    so normalizing them again returns them unchanged.
+    """
+
+    __slots__ = ('_dict_cache', '_is_normalized')
+
+    def _mark_normalized(self: _T) -> _T:
+        object.__setattr__(self, '_is_normalized', True)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        cached = getattr(self, '_dict_cache', None)
+        if cached is None:
+            cached = self._build_dict()
+            object.__setattr__(self, '_dict_cache', cached)
+        return dict(cached)
+
+
+@dataclass(frozen=True, slots=True)
+class CommandArgument(_CachedDictMixin):
     """Typed argument definition for a command."""
 
     name: str
@@ -204,13 +339,17 @@ class CommandArgument:
     properties: Optional[Dict[str, Any]] = None  # Schema for object properties
 
     def normalized(self) -> 'CommandArgument':
+        if getattr(self, '_is_normalized', False):
+            return self
         name = str(self.name or "").strip()
         if not name:
             raise ValueError("argument name cannot be empty")
+        # Prepared args are keyed by this name; interning lets handler
+        # lookups such as args["users"] match on identity.
+        name = sys.intern(name)
 
         arg_type = (self.type or "string").strip().lower()
-        valid_types = {"string", "integer", "number", "boolean", "array", "object"}
-        if arg_type not in valid_types:
+        if arg_type not in _VALID_ARG_TYPES:
             arg_type = "string"
 
         description = (self.description or "").strip() or None
@@ -238,9 +377,9 @@ class CommandArgument:
             enum=enum,
             items=self.items,
             properties=self.properties,
-        )
+        )._mark_normalized()
 
-    def to_dict(self) -> Dict[str, Any]:
+    def _build_dict(self) -> Dict[str, Any]:
         normalized = self.normalized()
         data: Dict[str, Any] = {
             "name": normalized.name,
@@ -261,8 +400,18 @@ class CommandArgument:
         return data
 
 
-@dataclass
-class CommandDefinition:
+# A run of characters not allowed in slash command names, together with an
+# underscore right before it, collapses into a single underscore. \w matches
+# the same characters as str.isalnum() plus "_".
+_SLASH_SEPARATOR = re.compile(r"_?[^\w\-:]+")
+
+# Word boundaries in a command name: separator runs, lowercase-to-uppercase
+# steps ("fooBar") and the end of an acronym ("HTTPServer").
+_TITLE_WORD_BREAK = re.compile(r"[\s_\-.:]+|(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+
+
+@dataclass(frozen=True, slots=True)
+class CommandDefinition(_CachedDictMixin):
     """Describes a command that the managed process exposes."""
 
     name: str
@@ -279,6 +428,8 @@ class CommandDefinition:
     hidden: bool = False
 
     def normalized(self) -> 'CommandDefinition':
+        if getattr(self, '_is_normalized', False):
+            return self
         name = str(self.name).strip()
         if not name:
             name = str(self.name)
@@ -336,22 +487,14 @@ class CommandDefinition:
             async_enabled=async_enabled,
             progress_label=progress_label,
             hidden=hidden,
-        )
+        )._mark_normalized()
 
     @staticmethod
     def _normalize_slash(value: str) -> str:
         candidate = str(value).strip().lstrip('/')
         if not candidate:
             candidate = "command"
-        cleaned = []
-        for ch in candidate:
-            if ch.isalnum() or ch in {'_', '-', ':'}:
-                cleaned.append(ch.lower())
-            elif ch.isspace() and (not cleaned or cleaned[-1] != '_'):
-                cleaned.append('_')
-            elif cleaned and cleaned[-1] != '_':
-                cleaned.append('_')
-        slug = ''.join(cleaned).strip('_')
+        slug = _SLASH_SEPARATOR.sub('_', candidate).lower().strip('_')
         if not slug:
             slug = candidate.replace(' ', '_').lower()
         return f"/{slug}"
@@ -382,10 +525,7 @@ class CommandDefinition:
         if not trimmed:
             return ""
 
-        cleaned = re.sub(r"[_\-\.:]+", " ", trimmed)
-        cleaned = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", cleaned)
-        cleaned = re.sub(r"([A-Z]+)([A-Z][a-z])", r"\1 \2", cleaned)
-        words = cleaned.split()
+        words = [word for word in _TITLE_WORD_BREAK.split(trimmed) if word]
         if not words:
             return trimmed
 
@@ -399,7 +539,7 @@ class CommandDefinition:
 
         return " ".join(transform(word) for word in words)
 
-    def to_dict(self) -> Dict[str, Any]:
+    def _build_dict(self) -> Dict[str, Any]:
         normalized = self.normalized()
         data: Dict[str, Any] = {"name": normalized.name}
         if normalized.title:
@@ -407,7 +547,8 @@ class CommandDefinition:
         if normalized.description:
             data["description"] = normalized.description
         if normalized.expose_as:
-            data["expose_as"] = [exp.value if isinstance(exp, Enum) else str(exp) for exp in normalized.expose_as]
+            # normalized() only keeps CommandExposure members
+            data["expose_as"] = [exp.value for exp in normalized.expose_as]
         if normalized.slash_command:
             data["slash_command"] = normalized.slash_command
         if normalized.slash_scope:
@@ -433,14 +574,20 @@ class CommandDefinition:
         normalized: List[CommandArgument] = []
         seen: Set[str] = set()
         for value in values:
-            try:
-                if isinstance(value, CommandArgument):
-                    argument = value.normalized()
-                elif isinstance(value, dict):
-                    argument = CommandArgument(**value).normalized()
-                else:
+            if isinstance(value, CommandArgument):
+                argument = value
+            elif isinstance(value, dict):
+                try:
+                    argument = CommandArgument(**value)
+                except TypeError:
+                    # Missing name or unknown keys
                     continue
-            except Exception:
+            else:
+                continue
+            try:
+                argument = argument.normalized()
+            except (ValueError, TypeError, AttributeError):
+                # Empty name, or a field with an unusable type (e.g. type=5)
                 continue
             if argument.name in seen:
                 continue
@@ -449,7 +596,7 @@ class CommandDefinition:
         return normalized or None
 
 
-@dataclass
+@dataclass(slots=True)
 class CommandRegistryMessage:
     """List of commands exposed by the process"""
     commands: Optional[List[Dict[str, Any]]] = None
@@ -460,7 +607,7 @@ class CommandRegistryMessage:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentDescriptionMessage:
     """Runtime description metadata for the managed agent."""
 
@@ -470,7 +617,7 @@ class AgentDescriptionMessage:
         return {'description': (self.description or '').strip()}
 
 
-@dataclass
+@dataclass(slots=True)
 class SidebarSectionMessage:
     """Custom sidebar section for displaying agent-specific information."""
 
@@ -488,7 +635,7 @@ class SidebarSectionMessage:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class SidebarSectionRemovalMessage:
     """Message to remove a custom sidebar section."""
 
@@ -500,7 +647,7 @@ class SidebarSectionRemovalMessage:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ErrorMessage:
     """Error reporting message"""
     error: str
@@ -518,63 +665,121 @@ class ErrorMessage:
 
 class Protocol:
     """Protocol handler for process communication"""
-    
+
     @staticmethod
-    def send_message(msg_type: MessageType, data: Optional[Dict[str, Any]] = None):
+    @contextmanager
+    def batch() -> Iterator[None]:
+        """Send the messages emitted by this thread in the block as one write.
+
+        Messages keep their order and are written when the outermost block
+        exits, even if it raises. Nested blocks join the outer batch.
+
+        Example:
+            with Protocol.batch():
+                Protocol.send_command_progress(cmd_id, status="indexing")
+                Protocol.send_log(LogLevel.INFO, "Indexing started")
+        """
+        if getattr(_batch_state, 'lines', None) is not None:
+            yield
+            return
+        lines: List[str] = []
+        _batch_state.lines = lines
+        try:
+            yield
+        finally:
+            _batch_state.lines = None
+            if lines:
+                _write_line(''.join(lines))
+
+    @staticmethod
+    def send_message(msg_type: Union[MessageType, str], data: Optional[Dict[str, Any]] = None):
         """Send a message to the process manager via stdout"""
-        message = Message(
-            type=msg_type,
-            timestamp=datetime.now(timezone.utc).isoformat(),
-            data=data
-        )
-        sys.stdout.write(message.to_json() + '\n')
-        sys.stdout.flush()
+        # Same envelope as Message.to_json, built without the Message object.
+        # MessageType is a str enum, so the encoder writes it as its value.
+        _write_line(_encode_json({
+            'type': msg_type,
+            'timestamp': _utcnow_iso(),
+            'data': data
+        }) + '\n')
     
     @staticmethod
     def send_ready(pid: int, version: Optional[str] = None):
         """Send ready message"""
-        msg = ReadyMessage(pid=pid, version=version)
-        Protocol.send_message(MessageType.READY, msg.to_dict())
+        payload: Dict[str, Any] = {'pid': pid}
+        if version is not None:
+            payload['version'] = version
+        Protocol.send_message(MessageType.READY, payload)
     
     
     @staticmethod
     def send_log(level: LogLevel, message: str, fields: Optional[Dict[str, Any]] = None):
         """Send log message"""
-        msg = LogMessage(level=level, message=message, fields=fields)
-        Protocol.send_message(MessageType.LOG, msg.to_dict())
+        # Payloads on the hot send_* paths are built directly rather than
+        # through their message dataclasses; the output is the same.
+        payload: Dict[str, Any] = {
+            'level': _LOG_LEVEL_VALUES.get(level, level),
+            'message': message
+        }
+        if fields:
+            payload['fields'] = fields
+        Protocol.send_message(_TYPE_LOG, payload)
 
     @staticmethod
     def send_error(error: str, code: Optional[int] = None, details: Optional[str] = None):
         """Send error message"""
-        msg = ErrorMessage(error=error, code=code, details=details)
-        Protocol.send_message(MessageType.ERROR, msg.to_dict())
+        payload: Dict[str, Any] = {'error': error}
+        if code is not None:
+            payload['code'] = code
+        if details:
+            payload['details'] = details
+        Protocol.send_message(_TYPE_ERROR, payload)
 
     @staticmethod
     def send_response(success: bool, command_id: Optional[str] = None,
                       result: Optional[Any] = None, error: Optional[str] = None):
         """Send response to a command"""
-        msg = ResponseMessage(
-            command_id=command_id,
-            success=success,
-            result=result,
-            error=error
-        )
-        Protocol.send_message(MessageType.RESPONSE, msg.to_dict())
+        payload: Dict[str, Any] = {'success': success}
+        if command_id:
+            payload['command_id'] = command_id
+        if result is not None:
+            payload['result'] = result
+        if error:
+            payload['error'] = error
+        Protocol.send_message(_TYPE_RESPONSE, payload)
+
+    @staticmethod
+    def send_serialized_response(command_id: Optional[str], result_json: str) -> None:
+        """Send a successful response whose result is already JSON-encoded.
+
+        The output is identical to ``send_response(success=True, ...)``; the
+        result text is spliced into the envelope instead of re-encoded.
+        """
+        head = _encode_json({
+            'type': _TYPE_RESPONSE,
+            'timestamp': _utcnow_iso(),
+            'data': {'success': True, 'command_id': command_id} if command_id else {'success': True},
+        })
+        # head ends with the closing braces of "data" and the envelope
+        _write_line(f'{head[:-2]}, "result": {result_json}}}}}\n')
 
     @staticmethod
     def send_command_progress(command_id: Optional[str], *, text: Optional[str] = None,
                               metadata: Optional[Dict[str, Any]] = None,
                               status: Optional[str] = None,
                               progress: Optional[float] = None) -> None:
-        payload = CommandProgress(
-            command_id=command_id,
-            text=text,
-            metadata=metadata,
-            status=status,
-            progress=progress,
-        ).to_dict()
+        payload: Dict[str, Any] = {}
+        if command_id:
+            payload['command_id'] = command_id
+        if text:
+            payload['text'] = text
+        if metadata:
+            payload['metadata'] = metadata
+        if status:
+            payload['status'] = status
+        if progress is not None:
+            payload['progress'] = float(progress)
         if payload:
-            Protocol.send_message(MessageType.COMMAND_PROGRESS, payload)
+            Protocol.send_message(_TYPE_COMMAND_PROGRESS, payload)
 
     @staticmethod
     def send_command_registry(commands: Iterable[Union[CommandDefinition, Dict[str, Any], str]]):
@@ -602,6 +807,12 @@ class Protocol:
         msg = CommandRegistryMessage(commands=payload)
         Protocol.send_message(MessageType.COMMAND_REGISTRY, msg.to_dict())
 
+    @staticmethod
+    def send_serialized_command_registry(commands: List[Dict[str, Any]]) -> None:
+        """Send command definitions that were already serialized with to_dict()."""
+        msg = CommandRegistryMessage(commands=commands)
+        Protocol.send_message(MessageType.COMMAND_REGISTRY, msg.to_dict())
+
     @staticmethod
     def send_system_prompt(prompt: Optional[str], *, replace: bool = False) -> None:
         """Publish the managed agent's system prompt to the manager."""
@@ -640,10 +851,14 @@ class Protocol:
     @staticmethod
     def read_message() -> Optional[Message]:
         """Read a message from stdin"""
+        # Read bytes when stdin has a binary buffer; json.loads decodes UTF-8
+        # itself and ignores the surrounding whitespace and newline.
+        stream = getattr(sys.stdin, 'buffer', sys.stdin)
         try:
-            line = sys.stdin.readline()
+            line = stream.readline()
             if line:
-                return Message.from_json(line.strip())
-        except (json.JSONDecodeError, ValueError):
+                return Message.from_dict(json.loads(line))
+        except ValueError:
+            # JSONDecodeError, UnicodeDecodeError or an unknown message type
             pass
         return None
@@ -3,13 +3,11 @@
 from __future__ import annotations
 
 import json
-import os
-import socket
-import tempfile
-from typing import Final, Optional
+from typing import Final
+
+from . import daemon
+from .daemon import DEFAULT_SOCKET_NAME, ENV_SOCKET_PATH
 
-DEFAULT_SOCKET_NAME: Final[str] = "opperator.sock"
-ENV_SOCKET_PATH: Final[str] = "OPPERATOR_SOCKET_PATH"
 REQUEST_TYPE: Final[str] = "secret_get"
 
 
@@ -17,11 +15,7 @@ class SecretError(RuntimeError):
     """Raised when a secret cannot be retrieved from the daemon."""
 
 
-def _resolve_socket_path() -> str:
-    by_env = os.environ.get(ENV_SOCKET_PATH)
-    if by_env:
-        return by_env
-    return os.path.join(tempfile.gettempdir(), DEFAULT_SOCKET_NAME)
+_resolve_socket_path = daemon.resolve_socket_path
 
 
 def get_secret(name: str, *, timeout: float = 5.0) -> str:
@@ -48,18 +42,11 @@ def get_secret(name: str, *, timeout: float = 5.0) -> str:
         "secret_name": trimmed,
     }
 
-    path = _resolve_socket_path()
+    raw = json.dumps(payload).encode("utf-8") + b"\n"
     try:
-        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
-            sock.settimeout(timeout)
-            sock.connect(path)
-            raw = json.dumps(payload).encode("utf-8") + b"\n"
-            sock.sendall(raw)
-
-            # Read a single JSON line response
-            with sock.makefile("r", encoding="utf-8") as reader:
-                line: Optional[str] = reader.readline()
+        line = daemon.request(raw, timeout)
     except OSError as exc:
+        path = _resolve_socket_path()
         raise SecretError(f"failed to contact daemon at {path}: {exc}") from exc
 
     if not line:
@@ -67,7 +54,8 @@ def get_secret(name: str, *, timeout: float = 5.0) -> str:
 
     try:
         response = json.loads(line)
-    except json.JSONDecodeError as exc:
+    except ValueError as exc:
+        # JSONDecodeError, or UnicodeDecodeError for bytes that aren't UTF-8
         raise SecretError(f"invalid response from daemon: {exc}") from exc
 
     if not response.get("success", False):
@@ -27,10 +27,6 @@ class TestAgent(OpperatorAgent):
         """Required start method"""
         pass
 
-    def _coerce_argument_value(self, arg_type, value, items=None, properties=None):
-        # Use the parent implementation
-        return super()._coerce_argument_value(arg_type, value, items, properties)
-
 
 def test_array_of_strings():
     """Test array of strings validation"""
@@ -186,6 +182,13 @@ def test_array_from_json_string():
     )
     assert result == [1, 2, 3], f"Expected [1, 2, 3], got {result}"
 
+    # Invalid JSON keeps json.loads' error message
+    try:
+        agent._coerce_argument_value("array", "\ufeff[1, 2]", items={"type": "integer"})
+        assert False, "Should have raised ValueError for BOM-prefixed JSON"
+    except ValueError as e:
+        assert "Unexpected UTF-8 BOM" in str(e), f"Expected json.loads' BOM error, got: {e}"
+
     print("✓ Array parsing from JSON strings passed")
 
 
@@ -226,6 +229,48 @@ def test_error_handling():
     print("✓ Error handling tests passed")
 
 
+def test_error_aggregation():
+    """Test that every invalid array item is reported in one error"""
+    print("Testing error aggregation...")
+    agent = TestAgent()
+
+    # A single invalid item names its index
+    try:
+        agent._coerce_argument_value("array", [1, "x", 3], items={"type": "integer"})
+        assert False, "Should have raised ValueError for invalid integer"
+    except ValueError as e:
+        assert str(e).startswith("Array item at index 1 is invalid: "), str(e)
+
+    # Several invalid items are listed together
+    try:
+        agent._coerce_argument_value("array", ["a", 2, "c"], items={"type": "integer"})
+        assert False, "Should have raised ValueError for invalid integers"
+    except ValueError as e:
+        message = str(e)
+        assert message.startswith("2 array items are invalid: index 0: "), message
+        assert "; index 2: " in message, message
+
+    # Only the first ten are shown
+    try:
+        agent._coerce_argument_value("array", ["x"] * 13, items={"type": "integer"})
+        assert False, "Should have raised ValueError for invalid integers"
+    except ValueError as e:
+        message = str(e)
+        assert message.startswith("13 array items are invalid: "), message
+        assert "index 9: " in message and "index 10: " not in message, message
+        assert message.endswith("; and 3 more"), message
+
+    # An infinite float is reported like any other invalid integer
+    for value in ([float("inf")], '[1e400]', [True, float("inf")]):
+        try:
+            agent._coerce_argument_value("array", value, items={"type": "integer"})
+            assert False, f"Should have raised ValueError for {value!r}"
+        except ValueError as e:
+            assert "infinity" in str(e), str(e)
+
+    print("✓ Error aggregation tests passed")
+
+
 if __name__ == "__main__":
     print("=" * 60)
     print("Array Argument Validation Tests")
@@ -239,6 +284,7 @@ if __name__ == "__main__":
         test_nested_arrays()
         test_array_from_json_string()
         test_error_handling()
+        test_error_aggregation()
 
         print()
         print("=" * 60)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test script for async command scheduling.
+
+This script tests commands registered with async_enabled=True, including:
+- Rejecting commands once the async queue is full
+- Releasing queue slots as commands finish
+"""
+
+import io
+import json
+import os
+import sys
+import threading
+import time
+
+# Add the parent directory (python-base) to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from opperator.agent import OpperatorAgent, _ASYNC_QUEUE_FACTOR
+from opperator.protocol import CommandMessage
+
+
+class TestAgent(OpperatorAgent):
+    def initialize(self):
+        """Required initialize method"""
+        pass
+
+    def start(self):
+        """Required start method"""
+        pass
+
+
+def wait_for(condition, timeout=5.0):
+    """Poll *condition* until it returns True or *timeout* expires"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out waiting for condition"
+        time.sleep(0.01)
+
+
+def free_slots(slots, capacity):
+    """Count the free permits of *slots* without keeping any of them"""
+    acquired = 0
+    while acquired < capacity and slots.acquire(blocking=False):
+        acquired += 1
+    for _ in range(acquired):
+        slots.release()
+    return acquired
+
+
+def test_queue_full_rejects_and_releases():
+    """Test the busy response when the queue is full, and slot release"""
+    print("Testing async queue full...")
+    release = threading.Event()
+    started = []
+
+    def blocking(args):
+        started.append(args["n"])
+        release.wait(timeout=5)
+        return args["n"]
+
+    saved_stdout = sys.stdout
+    sys.stdout = output = io.StringIO()
+    try:
+        agent = TestAgent(max_async_workers=1)
+        agent.register_command(
+            "block",
+            blocking,
+            arguments=[{"name": "n", "type": "integer"}],
+            async_enabled=True,
+        )
+        capacity = _ASYNC_QUEUE_FACTOR
+
+        def send(command_id, n):
+            agent._handle_command(
+                CommandMessage(command="block", args={"n": n}, id=command_id)
+            )
+
+        def responses():
+            messages = [json.loads(line) for line in output.getvalue().splitlines()]
+            return {
+                m["data"]["command_id"]: m["data"]
+                for m in messages
+                if m["type"] == "response"
+            }
+
+        # One running and the rest queued fill every slot
+        for n in range(capacity):
+            send(f"fill-{n}", n)
+        wait_for(lambda: started == [0])
+        send("overflow", 99)
+
+        rejected = responses()
+        assert list(rejected) == ["overflow"], f"Expected only the overflow reply, got {rejected}"
+        assert rejected["overflow"]["success"] is False
+        assert rejected["overflow"]["error"] == "agent busy: async queue full"
+
+        # Finishing the queued commands gives every slot back
+        release.set()
+        wait_for(lambda: len(responses()) == capacity + 1)
+        for n in range(capacity):
+            assert responses()[f"fill-{n}"] == {
+                "success": True, "command_id": f"fill-{n}", "result": n,
+            }
+
+        wait_for(lambda: free_slots(agent._async_slots, capacity) == capacity)
+
+        # The queue takes a full load again, and still rejects beyond it
+        release.clear()
+        started.clear()
+        for n in range(capacity):
+            send(f"again-{n}", n)
+        wait_for(lambda: started == [0])
+        send("overflow-again", 99)
+        assert list(responses())[-1] == "overflow-again", responses()
+        assert len(responses()) == capacity + 2, responses()
+        release.set()
+        wait_for(lambda: len(responses()) == 2 * capacity + 2)
+        assert all(responses()[f"again-{n}"]["success"] for n in range(capacity))
+    finally:
+        release.set()
+        sys.stdout = saved_stdout
+        agent._shutdown_async_executor()
+
+    print("✓ Async queue full passed")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Async Command Tests")
+    print("=" * 60)
+    print()
+
+    try:
+        test_queue_full_rejects_and_releases()
+
+        print()
+        print("=" * 60)
+        print("✓ All tests passed!")
+        print("=" * 60)
+        sys.exit(0)
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print(f"✗ Test failed: {e}")
+        print("=" * 60)
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
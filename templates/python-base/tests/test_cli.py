@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Test script for the op CLI wrappers.
+
+This script tests the helpers behind agent-to-agent invocation, including:
+- Locating the op binary and caching it per PATH value
+- Reading untyped event fields through ExecEvent
+- Parsing streamed op exec output
+- Large command replies alongside stderr progress
+"""
+
+import io
+import json
+import os
+import stat
+import sys
+import tempfile
+import threading
+
+# Add the parent directory (python-base) to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from opperator import cli
+
+
+def make_executable(directory, name, content="#!/bin/sh\n"):
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        f.write(content)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+    return path
+
+
+def test_find_op_binary_cache():
+    """Test that the op binary is cached per PATH until the cache is reset"""
+    print("Testing op binary cache...")
+    saved_path = os.environ.get("PATH")
+    first_dir, second_dir = tempfile.mkdtemp(), tempfile.mkdtemp()
+    try:
+        op_path = make_executable(first_dir, "op")
+        os.environ["PATH"] = first_dir
+        cli._reset_op_path_cache()
+        assert cli._find_op_binary() == op_path
+
+        # While PATH is unchanged the cached path is reused without a rescan
+        os.remove(op_path)
+        assert cli._find_op_binary() == op_path
+
+        # Resetting the cache forces a new lookup
+        cli._reset_op_path_cache()
+        try:
+            cli._find_op_binary()
+            assert False, "Should have raised FileNotFoundError"
+        except FileNotFoundError:
+            pass
+
+        # Failed lookups aren't cached, so a later install is found
+        op_path = make_executable(first_dir, "op")
+        assert cli._find_op_binary() == op_path
+
+        # A different PATH value is looked up again; "opperator" also works
+        opperator_path = make_executable(second_dir, "opperator")
+        os.environ["PATH"] = second_dir
+        assert cli._find_op_binary() == opperator_path
+        os.environ["PATH"] = first_dir
+        assert cli._find_op_binary() == op_path
+    finally:
+        if saved_path is None:
+            os.environ.pop("PATH", None)
+        else:
+            os.environ["PATH"] = saved_path
+        cli._reset_op_path_cache()
+
+    print("✓ Op binary cache passed")
+
+
+def test_exec_event_raw_fields():
+    """Test that untyped event fields are read from the raw event"""
+    print("Testing ExecEvent raw fields...")
+    client = cli.ExecClient(op_binary_path="op")
+    raw = {
+        "type": "session.completed",
+        "session_id": "s1",
+        "final_response": "done",
+        "total_turns": 3,
+        "agent_type": "managed",
+        "item": {"id": "i1", "type": "tool_call", "status": "ok", "name": "search"},
+    }
+    event = client._parse_event(raw)
+
+    assert event.type is cli.EventType.SESSION_COMPLETED
+    assert event.session_id == "s1"
+    assert event.agent_type is cli.AgentType.MANAGED
+    assert event.item.type is cli.ItemType.TOOL_CALL and event.item.name == "search"
+    assert event.item.text is None
+    assert event.raw is raw
+
+    # Known event fields come from raw, and are None when absent
+    assert event.final_response == "done"
+    assert event.total_turns == 3
+    assert event.turn_number is None
+    assert getattr(event, "task_id", "missing") is None
+
+    # Anything else is still an AttributeError
+    assert not hasattr(event, "not_an_event_field")
+    try:
+        event.not_an_event_field
+        assert False, "Should have raised AttributeError"
+    except AttributeError as e:
+        assert "not_an_event_field" in str(e)
+
+    # Values this SDK doesn't know are kept as plain strings
+    event = client._parse_event({"type": "future.event", "agent_type": "other"})
+    assert event.type == "future.event" and event.agent_type == "other"
+    assert event.session_id == "" and event.item is None
+
+    print("✓ ExecEvent raw fields passed")
+
+
+def test_exec_parses_streamed_events():
+    """Test ExecClient.exec against a fake op binary"""
+    print("Testing exec event stream...")
+    directory = tempfile.mkdtemp()
+    events = [
+        {"type": "session.started", "session_id": "resume-me"},
+        {"type": "item.updated", "session_id": "resume-me",
+         "item": {"id": "i1", "type": "agent_message", "status": "running", "text": "hé"}},
+        {"type": "session.completed", "session_id": "resume-me", "final_response": "all done"},
+    ]
+    output = "\n".join(json.dumps(event) for event in events[:2])
+    output += "\n\nplain text line\n" + json.dumps(events[2]) + "\r\n"
+    data_path = os.path.join(directory, "output.txt")
+    with open(data_path, "w", encoding="utf-8") as f:
+        f.write(output)
+    op_path = make_executable(directory, "op", f"#!/bin/sh\ncat '{data_path}'\n")
+
+    seen = []
+    saved_stderr = sys.stderr
+    sys.stderr = stderr = io.StringIO()
+    try:
+        result = cli.ExecClient(op_binary_path=op_path).exec("hi", event_callback=seen.append)
+    finally:
+        sys.stderr = saved_stderr
+
+    assert result.success, result.error
+    assert result.resume_id == "resume-me"
+    assert result.response == "all done"
+    assert [event.type for event in result.events] == [
+        cli.EventType.SESSION_STARTED,
+        cli.EventType.ITEM_UPDATED,
+        cli.EventType.SESSION_COMPLETED,
+    ]
+    assert seen == result.events
+    assert result.events[1].item.text == "hé"
+    assert stderr.getvalue() == "plain text line\n", repr(stderr.getvalue())
+
+    print("✓ Exec event stream passed")
+
+
+def test_command_large_reply_with_progress():
+    """Test a reply larger than a pipe buffer while stderr reports progress"""
+    print("Testing large command reply...")
+    directory = tempfile.mkdtemp()
+    payload = {"rows": [{"id": n, "value": "x" * 20} for n in range(10000)]}
+    data_path = os.path.join(directory, "reply.json")
+    with open(data_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    assert os.path.getsize(data_path) > 300_000
+    # stderr stays open while stdout fills, so reading one pipe to EOF
+    # before the other blocks both processes
+    op_path = make_executable(directory, "op", (
+        "#!/bin/sh\n"
+        "echo 'Loading rows' >&2\n"
+        f"cat '{data_path}'\n"
+        "echo '{\"debug\": true}' >&2\n"
+        "echo 'Done' >&2\n"
+    ))
+
+    progress = []
+    outcome = []
+    worker = threading.Thread(target=lambda: outcome.append(cli.command(
+        "processor", "export", args={"limit": 10000},
+        progress_callback=progress.append, op_binary_path=op_path,
+    )), daemon=True)
+    worker.start()
+    worker.join(timeout=10)
+    assert not worker.is_alive(), "command() deadlocked on a large reply"
+
+    result = outcome[0]
+    assert result.success, result.error
+    assert result.result == payload
+    # JSON lines on stderr aren't reported as progress
+    assert progress == ["Loading rows", "Done"], progress
+
+    print("✓ Large command reply passed")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("CLI Wrapper Tests")
+    print("=" * 60)
+    print()
+
+    try:
+        test_find_op_binary_cache()
+        test_exec_event_raw_fields()
+        test_exec_parses_streamed_events()
+        test_command_large_reply_with_progress()
+
+        print()
+        print("=" * 60)
+        print("✓ All tests passed!")
+        print("=" * 60)
+        sys.exit(0)
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print(f"✗ Test failed: {e}")
+        print("=" * 60)
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
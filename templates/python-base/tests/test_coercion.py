@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Test script for compiled argument coercers.
+
+This script checks compile_coercer against a table of fixtures covering:
+- Scalar coercion (string, integer, number, boolean)
+- Arrays and objects, given directly or as JSON strings
+- Nested schemas
+- Values that can't be coerced
+- The fast path for arrays whose items already have the exact type
+- Valid arrays and objects being returned without a copy
+- Bulk conversion of homogeneous arrays matching per-item coercion
+"""
+
+import os
+import random
+import sys
+
+# Add the parent directory (python-base) to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from opperator.coercion import compile_coercer
+
+
+class Fails:
+    """Expected outcome: ValueError whose message contains *text*"""
+
+    def __init__(self, text=""):
+        self.text = text
+
+    def __repr__(self):
+        return f"Fails({self.text!r})"
+
+
+USER = {
+    "name": {"type": "string", "required": True},
+    "age": {"type": "integer"},
+    "active": {"type": "boolean"},
+}
+
+# (type, items, properties, value, expected)
+FIXTURES = [
+    # Strings
+    ("string", None, None, "text", "text"),
+    ("string", None, None, 12, "12"),
+    ("string", None, None, 1.5, "1.5"),
+    ("string", None, None, True, "True"),
+    ("string", None, None, None, None),
+    # Integers
+    ("integer", None, None, 7, 7),
+    ("integer", None, None, " 42 ", 42),
+    ("integer", None, None, "-3", -3),
+    ("integer", None, None, 3.0, 3),
+    ("integer", None, None, 3.7, 3),
+    ("integer", None, None, "1.5", Fails("invalid literal")),
+    ("integer", None, None, "abc", Fails("invalid literal")),
+    ("integer", None, None, True, Fails("Boolean value is not valid for integer")),
+    ("integer", None, None, None, None),
+    # Numbers
+    ("number", None, None, 1.5, 1.5),
+    ("number", None, None, 2, 2.0),
+    ("number", None, None, " 2.5 ", 2.5),
+    ("number", None, None, "1e3", 1000.0),
+    ("number", None, None, "x", Fails("could not convert")),
+    ("number", None, None, False, Fails("Boolean value is not valid for number")),
+    # Booleans
+    ("boolean", None, None, True, True),
+    ("boolean", None, None, "true", True),
+    ("boolean", None, None, " Yes ", True),
+    ("boolean", None, None, "ON", True),
+    ("boolean", None, None, "off", False),
+    ("boolean", None, None, "0", False),
+    ("boolean", None, None, 0, False),
+    ("boolean", None, None, 2.5, True),
+    ("boolean", None, None, "maybe", Fails("Cannot interpret 'maybe' as boolean")),
+    ("boolean", None, None, [], Fails("as boolean")),
+    # Type names are case-insensitive; unknown types pass values through
+    ("INTEGER", None, None, "5", 5),
+    (None, None, None, 5, "5"),
+    ("custom", None, None, {"a": 1}, {"a": 1}),
+    # Arrays
+    ("array", None, None, [1, "a", None], [1, "a", None]),
+    ("array", {"type": "string"}, None, ["a", "b"], ["a", "b"]),
+    ("array", {"type": "string"}, None, [1, 2.5], ["1", "2.5"]),
+    ("array", {"type": "integer"}, None, ["1", 2, 3.0], [1, 2, 3]),
+    ("array", {"type": "integer"}, None, [" 1", "2 "], [1, 2]),
+    ("array", {"type": "number"}, None, [1, 2], [1.0, 2.0]),
+    ("array", {"type": "number"}, None, ["1.5", 2], [1.5, 2.0]),
+    ("array", {"type": "boolean"}, None, ["yes", 0, True], [True, False, True]),
+    ("array", {"type": "integer"}, None, [], []),
+    ("array", {"type": "integer"}, None, '[1, "2", 3]', [1, 2, 3]),
+    ("array", {"type": "integer"}, None, " [1] ", [1]),
+    ("array", {"type": "array", "items": {"type": "integer"}}, None,
+     [["1", 2], [3.0]], [[1, 2], [3]]),
+    ("array", {"type": "integer"}, None, ["1", "x"], Fails("Array item at index 1 is invalid")),
+    ("array", {"type": "integer"}, None, [True], Fails("Array item at index 0 is invalid")),
+    ("array", {"type": "integer"}, None, "[1,", Fails("Cannot interpret '[1,' as array")),
+    ("array", {"type": "integer"}, None, '{"a": 1}', Fails("Expected a list for array argument")),
+    ("array", {"type": "integer"}, None, 5, Fails("Expected a list for array argument")),
+    ("array", {"type": "integer"}, None, None, None),
+    # Objects
+    ("object", None, None, {"x": [1]}, {"x": [1]}),
+    ("object", None, USER, {"name": "Ada", "age": "36", "active": "yes"},
+     {"name": "Ada", "age": 36, "active": True}),
+    ("object", None, USER, {"name": 7, "extra": "kept"}, {"name": "7", "extra": "kept"}),
+    ("object", None, USER, '{"name": "Ada", "age": "4"}', {"name": "Ada", "age": 4}),
+    ("object", None, USER, {"age": 3}, Fails("Object is missing required property 'name'")),
+    ("object", None, {"a": {"required": True}, "b": {"required": True}}, {},
+     Fails("Object is missing required properties 'a', 'b'")),
+    ("object", None, USER, {"name": "Ada", "age": "old"},
+     Fails("Object property 'age' is invalid")),
+    ("object", None, USER, "[1]", Fails("Expected a mapping for object argument")),
+    ("object", None, USER, "{", Fails("Cannot interpret '{' as object")),
+    ("object", None, USER, 3, Fails("Expected a mapping for object argument")),
+    # Arrays of objects and objects holding arrays
+    ("array", {"type": "object", "properties": USER}, None,
+     [{"name": "A", "age": "1"}, {"name": "B"}],
+     [{"name": "A", "age": 1}, {"name": "B"}]),
+    ("array", {"type": "object", "properties": USER}, None, [{"age": 1}],
+     Fails("Array item at index 0 is invalid: Object is missing required property 'name'")),
+    ("object", None, {"tags": {"type": "array", "items": {"type": "string"}}},
+     {"tags": '["a", 1]'}, {"tags": ["a", "1"]}),
+]
+
+
+def test_fixtures():
+    """Test every fixture's result or error"""
+    print("Testing coercion fixtures...")
+    for arg_type, items, properties, value, expected in FIXTURES:
+        coerce = compile_coercer(arg_type, items, properties)
+        case = f"{arg_type} {items or properties or ''} {value!r}"
+        if isinstance(expected, Fails):
+            try:
+                result = coerce(value)
+            except ValueError as e:
+                assert expected.text in str(e), f"{case}: unexpected error {e}"
+            else:
+                assert False, f"{case}: expected {expected}, got {result!r}"
+            continue
+
+        result = coerce(value)
+        assert result == expected, f"{case}: expected {expected!r}, got {result!r}"
+        assert type(result) is type(expected), f"{case}: got type {type(result).__name__}"
+        if isinstance(expected, list):
+            assert [type(item) for item in result] == [type(item) for item in expected], case
+
+    print(f"✓ {len(FIXTURES)} coercion fixtures passed")
+
+
+def test_typed_array_fast_path():
+    """Test arrays whose items already have the schema's exact type"""
+    print("Testing typed array fast path...")
+    cases = [
+        ("string", ["a", "b"]),
+        ("integer", [1, -2, 10**30]),
+        ("number", [1.5, float("inf")]),
+        ("boolean", [True, False]),
+    ]
+    for item_type, values in cases:
+        result = compile_coercer("array", {"type": item_type})(values)
+        assert result == values, f"{item_type}: got {result!r}"
+        assert all(type(a) is type(b) for a, b in zip(result, values)), item_type
+
+    # Only exact types skip coercion: ints become floats for "number",
+    # and bools are still rejected for "integer"
+    result = compile_coercer("array", {"type": "number"})([1, 2])
+    assert result == [1.0, 2.0] and all(type(item) is float for item in result)
+    try:
+        compile_coercer("array", {"type": "integer"})([1, True, 2])
+        assert False, "Should have raised ValueError for a bool in an integer array"
+    except ValueError as e:
+        assert str(e).startswith("Array item at index 1 is invalid: Boolean"), str(e)
+
+    # Mixed arrays only convert the items that need it
+    assert compile_coercer("array", {"type": "string"})(["a", 1, "b"]) == ["a", "1", "b"]
+
+    print("✓ Typed array fast path passed")
+
+
+def test_valid_containers_are_not_copied():
+    """Test that already-valid arrays and objects are returned as is"""
+    print("Testing containers without copies...")
+    values = [1, 2, 3]
+    assert compile_coercer("array", {"type": "integer"})(values) is values
+    untyped = [1, "a"]
+    assert compile_coercer("array")(untyped) is untyped
+
+    coerce_user = compile_coercer("object", properties=USER)
+    user = {"name": "Ada", "age": 36, "extra": [1]}
+    assert coerce_user(user) is user
+
+    # Nested containers that come back unchanged keep the parent uncopied
+    coerce_team = compile_coercer("object", properties={
+        "ids": {"type": "array", "items": {"type": "integer"}},
+        "lead": {"type": "object", "properties": USER},
+    })
+    team = {"ids": [1, 2], "lead": {"name": "Ada"}}
+    assert coerce_team(team) is team
+
+    # A changed property copies the object once; the input isn't modified
+    team = {"ids": ["1", 2], "lead": {"name": "Ada", "age": "36"}, "extra": True}
+    result = coerce_team(team)
+    assert result is not team
+    assert result == {"ids": [1, 2], "lead": {"name": "Ada", "age": 36}, "extra": True}
+    assert team == {"ids": ["1", 2], "lead": {"name": "Ada", "age": "36"}, "extra": True}
+
+    print("✓ Containers without copies passed")
+
+
+# Numeric-looking strings, including forms where int() and float() are lenient
+_NUMERIC_STRINGS = [
+    "0", "7", "-3", "+12", " 42 ", "\t5\n", "1_000", "1__0", "_1", "007",
+    "\u0661\u0662", "\uff13", "1.5", "-0.0", "1e3", "1E-2", ".5", "5.",
+    "nan", "NaN", "-inf", "Infinity", "1e400", "9" * 50, "9" * 5000,
+    "", " ", "x", "1x", "0x1f", "1,000", "\u00bd",
+]
+
+
+def _outcome(convert, values):
+    """Repr of the result, or "error" for the errors coercion can raise"""
+    try:
+        return repr(convert(values))
+    except (ValueError, OverflowError):
+        return "error"
+
+
+def test_bulk_conversion_matches_per_item():
+    """Test homogeneous arrays against the scalar coercer on each item"""
+    print("Testing bulk conversion against per-item coercion...")
+    rng = random.Random(1234)
+    pools = [
+        ("integer", _NUMERIC_STRINGS),
+        ("number", _NUMERIC_STRINGS),
+        ("number", [0, 1, -7, 2**53 + 1, 10**20, 10**400]),
+    ]
+    for item_type, pool in pools:
+        coerce_array = compile_coercer("array", {"type": item_type})
+        coerce_item = compile_coercer(item_type)
+        for _ in range(2000):
+            values = rng.choices(pool, k=rng.randint(1, 6))
+            bulk = _outcome(coerce_array, values)
+            per_item = _outcome(lambda items: [coerce_item(v) for v in items], values)
+            assert bulk == per_item, f"{item_type} {values!r}: {bulk} != {per_item}"
+
+    print("✓ Bulk conversion against per-item coercion passed")
+
+
+def test_json_length_limit():
+    """Test that JSON strings over max_json_length are rejected before parsing"""
+    print("Testing JSON length limit...")
+    coerce = compile_coercer("array", {"type": "integer"}, max_json_length=5)
+    assert coerce("[1,2]") == [1, 2]
+    assert coerce([1, 2, 3, 4, 5, 6]) == [1, 2, 3, 4, 5, 6]
+    try:
+        coerce("[1, 2]")
+        assert False, "Should have raised ValueError for a long JSON string"
+    except ValueError as e:
+        assert str(e) == "JSON argument is 6 characters; the limit is 5", str(e)
+
+    # Nested schemas share the limit
+    coerce = compile_coercer(
+        "object", properties={"ids": {"type": "array"}}, max_json_length=10
+    )
+    try:
+        coerce({"ids": "[1, 2, 3, 4]"})
+        assert False, "Should have raised ValueError for a long nested JSON string"
+    except ValueError as e:
+        assert "the limit is 10" in str(e), str(e)
+
+    print("✓ JSON length limit passed")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Coercion Tests")
+    print("=" * 60)
+    print()
+
+    try:
+        test_fixtures()
+        test_typed_array_fast_path()
+        test_valid_containers_are_not_copied()
+        test_bulk_conversion_matches_per_item()
+        test_json_length_limit()
+
+        print()
+        print("=" * 60)
+        print("✓ All tests passed!")
+        print("=" * 60)
+        sys.exit(0)
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print(f"✗ Test failed: {e}")
+        print("=" * 60)
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Test script for command registration.
+
+This script tests how commands are registered and published, including:
+- Argument validators and the _coerce_argument_value hook
+- Registration failures leaving the registry unchanged
+- Batched registration with register_commands and batch_commands
+"""
+
+import io
+import json
+import os
+import sys
+
+# Add the parent directory (python-base) to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from opperator.agent import OpperatorAgent
+
+
+class TestAgent(OpperatorAgent):
+    def initialize(self):
+        """Required initialize method"""
+        pass
+
+    def start(self):
+        """Required start method"""
+        pass
+
+
+class CapturedOutput:
+    """Collect the protocol messages written to stdout inside the block"""
+
+    def __enter__(self):
+        self._saved = sys.stdout
+        self._buffer = sys.stdout = io.StringIO()
+        return self
+
+    def __exit__(self, *exc_info):
+        sys.stdout = self._saved
+        return False
+
+    def registries(self):
+        """Command names of each command_registry message so far, in order"""
+        messages = [json.loads(line) for line in self._buffer.getvalue().splitlines()]
+        return [
+            [command["name"] for command in message["data"]["commands"]]
+            for message in messages
+            if message["type"] == "command_registry"
+        ]
+
+
+def noop(args):
+    return None
+
+
+def test_coerce_argument_value_override():
+    """Test that an overridden _coerce_argument_value is still called"""
+    print("Testing _coerce_argument_value override...")
+
+    class UpperAgent(TestAgent):
+        def _coerce_argument_value(self, arg_type, value, items=None, properties=None):
+            value = super()._coerce_argument_value(arg_type, value, items, properties)
+            return value.upper() if isinstance(value, str) else value
+
+    with CapturedOutput():
+        agent = UpperAgent()
+        agent.register_command(
+            "greet",
+            noop,
+            arguments=[
+                {"name": "name", "type": "string"},
+                {"name": "count", "type": "integer"},
+            ],
+        )
+    validator = agent._argument_validators["greet"]
+    result = validator({"name": "ada", "count": "2"})
+    assert result == {"name": "ADA", "count": 2}, f"Expected hook output, got {result}"
+
+    print("✓ _coerce_argument_value override passed")
+
+
+def test_failed_registration_leaves_registry_unchanged():
+    """Test that a malformed schema doesn't half-register a command"""
+    print("Testing failed registration...")
+    with CapturedOutput() as output:
+        agent = TestAgent()
+        agent.register_command("ping", noop)
+        for bad_argument in (
+            {"name": "tags", "type": "array", "items": "string"},
+            {"name": "user", "type": "object", "properties": {"age": 3}},
+        ):
+            for name in ("broken", "ping"):
+                try:
+                    agent.register_command(name, noop, arguments=[bad_argument])
+                    assert False, f"Should have rejected {bad_argument}"
+                except (AttributeError, TypeError, ValueError):
+                    pass
+
+    assert agent._sorted_command_names == ["ping"], agent._sorted_command_names
+    assert list(agent._command_handlers) == ["ping"]
+    assert list(agent._command_payloads) == ["ping"]
+    assert list(agent._argument_validators) == ["ping"]
+    assert agent._command_metadata["ping"].arguments is None
+    assert output.registries() == [["ping"]], output.registries()
+
+    print("✓ Failed registration passed")
+
+
+def test_register_commands():
+    """Test that register_commands registers in order and publishes once"""
+    print("Testing register_commands...")
+    calls = []
+    with CapturedOutput() as output:
+        agent = TestAgent()
+        agent.register_commands([
+            {"name": "zeta", "handler": lambda args: calls.append("zeta")},
+            {"name": "alpha", "handler": lambda args: calls.append("alpha"), "title": "First"},
+            {"name": "mid", "handler": noop, "arguments": [{"name": "n", "type": "integer"}]},
+            # A later entry replaces an earlier one with the same name
+            {"name": "zeta", "handler": lambda args: calls.append("zeta 2")},
+        ])
+
+    assert output.registries() == [["alpha", "mid", "zeta"]], output.registries()
+    assert list(agent._command_handlers) == ["zeta", "alpha", "mid"]
+    assert agent._sorted_command_names == ["alpha", "mid", "zeta"]
+    assert agent._command_metadata["alpha"].title == "First"
+    assert agent._argument_validators["mid"]({"n": "4"}) == {"n": 4}
+    agent._command_handlers["zeta"]({})
+    assert calls == ["zeta 2"], calls
+
+    print("✓ register_commands passed")
+
+
+def test_batch_commands():
+    """Test that batch_commands defers publishing until the outer block exits"""
+    print("Testing batch_commands...")
+    with CapturedOutput() as output:
+        agent = TestAgent()
+        agent.register_command("legacy", noop)
+        with agent.batch_commands():
+            agent.register_command("b", noop)
+            with agent.batch_commands():
+                agent.register_command("a", noop)
+            assert output.registries() == [["legacy"]], "Nested batch published early"
+            agent.unregister_command("legacy")
+        # An empty batch publishes nothing
+        with agent.batch_commands():
+            pass
+
+    assert output.registries() == [["legacy"], ["a", "b"]], output.registries()
+    assert agent._sorted_command_names == ["a", "b"]
+
+    print("✓ batch_commands passed")
+
+
+def test_register_commands_failure_partway():
+    """Test that a failing entry keeps earlier ones and publishes them once"""
+    print("Testing register_commands failure partway...")
+    with CapturedOutput() as output:
+        agent = TestAgent()
+        agent.register_command("existing", noop)
+        try:
+            agent.register_commands([
+                {"name": "first", "handler": noop},
+                {"name": "second", "handler": "not callable"},
+                {"name": "third", "handler": noop},
+            ])
+            assert False, "Should have raised TypeError for a non-callable handler"
+        except TypeError:
+            pass
+
+    assert agent._sorted_command_names == ["existing", "first"], agent._sorted_command_names
+    assert list(agent._command_handlers) == ["existing", "first"]
+    assert output.registries() == [["existing"], ["existing", "first"]], output.registries()
+    assert agent._registry_batch_depth == 0
+
+    # Later registrations publish immediately again
+    with CapturedOutput() as output:
+        agent.register_command("third", noop)
+    assert output.registries() == [["existing", "first", "third"]], output.registries()
+
+    print("✓ register_commands failure partway passed")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Command Registry Tests")
+    print("=" * 60)
+    print()
+
+    try:
+        test_coerce_argument_value_override()
+        test_failed_registration_leaves_registry_unchanged()
+        test_register_commands()
+        test_batch_commands()
+        test_register_commands_failure_partway()
+
+        print()
+        print("=" * 60)
+        print("✓ All tests passed!")
+        print("=" * 60)
+        sys.exit(0)
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print(f"✗ Test failed: {e}")
+        print("=" * 60)
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared daemon connection.
+
+This script runs a fake daemon on a temporary Unix socket and tests:
+- Connection reuse across requests
+- Concurrent requests on separate connections
+- Recovery when the daemon drops an idle connection
+- The whole call, including a retry, staying within the caller's timeout
+- Socket path caching
+"""
+
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+# Add the parent directory (python-base) to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from opperator import daemon
+from opperator.daemon import DaemonConnection
+
+
+class FakeDaemon:
+    """Answers each request line with {"success": true, "echo": <type>}.
+
+    ``delay`` is slept before each reply. ``replies_per_connection`` closes a
+    connection after that many replies, and ``hang_after`` stops answering on
+    a connection after that many replies. ``trickle`` sends each reply one
+    byte at a time, sleeping that long between bytes.
+    """
+
+    def __init__(self, delay=0.0, replies_per_connection=None, hang_after=None,
+                 trickle=None):
+        self.path = os.path.join(tempfile.mkdtemp(), "daemon.sock")
+        self.delay = delay
+        self.replies_per_connection = replies_per_connection
+        self.hang_after = hang_after
+        self.trickle = trickle
+        self.connections = 0
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.path)
+        self._server.listen()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        replies = 0
+        with conn, conn.makefile("rb") as reader:
+            for line in reader:
+                if self.hang_after is not None and replies >= self.hang_after:
+                    time.sleep(5)
+                    return
+                time.sleep(self.delay)
+                request = json.loads(line)
+                reply = {"success": True, "echo": request["type"]}
+                data = json.dumps(reply).encode("utf-8") + b"\n"
+                try:
+                    if self.trickle is None:
+                        conn.sendall(data)
+                    else:
+                        for i in range(len(data)):
+                            conn.sendall(data[i:i + 1])
+                            time.sleep(self.trickle)
+                except OSError:
+                    # The client gave up and closed its end
+                    return
+                replies += 1
+                if self.replies_per_connection == replies:
+                    return
+
+    def close(self):
+        self._server.close()
+
+
+def _request(connection, name, timeout=2.0):
+    raw = json.dumps({"type": name}).encode("utf-8") + b"\n"
+    return json.loads(connection.request(raw, timeout))
+
+
+def test_connection_reuse():
+    """Test that sequential requests share one socket"""
+    print("Testing connection reuse...")
+    server = FakeDaemon()
+    os.environ[daemon.ENV_SOCKET_PATH] = server.path
+    daemon._reset_socket_path_cache()
+    connection = DaemonConnection()
+    try:
+        for name in ("first", "second", "third"):
+            assert _request(connection, name)["echo"] == name
+        assert server.connections == 1, f"Expected 1 connection, got {server.connections}"
+    finally:
+        connection.close()
+        server.close()
+
+    print("✓ Connection reuse passed")
+
+
+def test_concurrent_requests():
+    """Test that concurrent requests don't queue behind each other"""
+    print("Testing concurrent requests...")
+    server = FakeDaemon(delay=0.3)
+    os.environ[daemon.ENV_SOCKET_PATH] = server.path
+    daemon._reset_socket_path_cache()
+    connection = DaemonConnection()
+    results = []
+    try:
+        threads = [
+            threading.Thread(target=lambda n=n: results.append(_request(connection, n)))
+            for n in ("a", "b", "c")
+        ]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        assert sorted(r["echo"] for r in results) == ["a", "b", "c"], results
+        assert elapsed < 0.8, f"Requests ran one after another ({elapsed:.2f}s)"
+    finally:
+        connection.close()
+        server.close()
+
+    print("✓ Concurrent requests passed")
+
+
+def test_dropped_connection_is_retried():
+    """Test that a request recovers when the daemon closed the idle socket"""
+    print("Testing dropped connection retry...")
+    server = FakeDaemon(replies_per_connection=1)
+    os.environ[daemon.ENV_SOCKET_PATH] = server.path
+    daemon._reset_socket_path_cache()
+    connection = DaemonConnection()
+    try:
+        assert _request(connection, "first")["echo"] == "first"
+        time.sleep(0.05)
+        assert _request(connection, "second")["echo"] == "second"
+        assert server.connections == 2, f"Expected 2 connections, got {server.connections}"
+    finally:
+        connection.close()
+        server.close()
+
+    print("✓ Dropped connection retry passed")
+
+
+def _assert_times_out(connection, name, timeout, limit):
+    started = time.monotonic()
+    try:
+        _request(connection, name, timeout=timeout)
+        assert False, f"{name}: should have timed out"
+    except OSError:
+        pass
+    elapsed = time.monotonic() - started
+    assert elapsed < limit, f"{name}: took {elapsed:.2f}s with a {timeout}s timeout"
+
+
+def test_retry_stays_within_timeout():
+    """Test that the whole call, including a retry, stays within the timeout"""
+    print("Testing retry timeout budget...")
+    servers = []
+    connection = DaemonConnection()
+    try:
+        # A reused connection that hangs, then a retry on a fresh one
+        server = FakeDaemon(hang_after=1)
+        servers.append(server)
+        os.environ[daemon.ENV_SOCKET_PATH] = server.path
+        daemon._reset_socket_path_cache()
+        _request(connection, "first")
+        _assert_times_out(connection, "second", 0.3, 0.5)
+
+        # A fresh connection to a daemon that never replies
+        server = FakeDaemon(hang_after=0)
+        servers.append(server)
+        os.environ[daemon.ENV_SOCKET_PATH] = server.path
+        daemon._reset_socket_path_cache()
+        _assert_times_out(connection, "silent", 0.3, 0.5)
+
+        # A reply split across many reads, each arriving well within the
+        # timeout, still can't take longer than the timeout in total
+        server = FakeDaemon(trickle=0.05)
+        servers.append(server)
+        os.environ[daemon.ENV_SOCKET_PATH] = server.path
+        daemon._reset_socket_path_cache()
+        _assert_times_out(connection, "trickle", 0.3, 0.5)
+        assert _request(connection, "trickle", timeout=5)["echo"] == "trickle"
+    finally:
+        connection.close()
+        for server in servers:
+            server.close()
+
+    print("✓ Retry timeout budget passed")
+
+
+def test_socket_path_cache():
+    """Test that the socket path is resolved once until the cache is reset"""
+    print("Testing socket path cache...")
+    os.environ[daemon.ENV_SOCKET_PATH] = "/tmp/first.sock"
+    daemon._reset_socket_path_cache()
+    assert daemon.resolve_socket_path() == "/tmp/first.sock"
+
+    os.environ[daemon.ENV_SOCKET_PATH] = "/tmp/second.sock"
+    assert daemon.resolve_socket_path() == "/tmp/first.sock"
+
+    daemon._reset_socket_path_cache()
+    assert daemon.resolve_socket_path() == "/tmp/second.sock"
+
+    del os.environ[daemon.ENV_SOCKET_PATH]
+    daemon._reset_socket_path_cache()
+    expected = os.path.join(tempfile.gettempdir(), daemon.DEFAULT_SOCKET_NAME)
+    assert daemon.resolve_socket_path() == expected
+
+    print("✓ Socket path cache passed")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Daemon Connection Tests")
+    print("=" * 60)
+    print()
+
+    try:
+        test_connection_reuse()
+        test_concurrent_requests()
+        test_dropped_connection_is_retried()
+        test_retry_stays_within_timeout()
+        test_socket_path_cache()
+
+        print()
+        print("=" * 60)
+        print("✓ All tests passed!")
+        print("=" * 60)
+        sys.exit(0)
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print(f"✗ Test failed: {e}")
+        print("=" * 60)
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Test script for the manager message reader.
+
+This script feeds protocol lines to an agent's stdin reader and checks
+the messages it writes back, including:
+- Lines that are not JSON objects being ignored
+- Several JSON objects on one line
+- Invalid arguments being answered with an error response, including
+  top-level values int() can't convert
+- Oversized JSON-string arguments being rejected
+- Reading from a stdin without a file descriptor
+- Splitting lines out of raw file descriptor reads
+"""
+
+import io
+import json
+import os
+import sys
+
+# Add the parent directory (python-base) to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from opperator.agent import OpperatorAgent
+from opperator.protocol import iter_fd_lines
+
+
+class TestAgent(OpperatorAgent):
+    def initialize(self):
+        """Required initialize method"""
+        pass
+
+    def start(self):
+        """Required start method"""
+        pass
+
+
+def command_line(command_id, command, args=None):
+    """Encode a command message the way the manager sends it"""
+    return json.dumps({
+        "type": "command",
+        "data": {"id": command_id, "command": command, "args": args or {}},
+    })
+
+
+def run_reader(agent, lines):
+    """Run the agent's reader over *lines* on a pipe and return its replies"""
+    read_fd, write_fd = os.pipe()
+    saved_stdin, saved_stdout = sys.stdin, sys.stdout
+    sys.stdin = os.fdopen(read_fd, "r")
+    sys.stdout = io.StringIO()
+    try:
+        agent._start_message_reader()
+        with os.fdopen(write_fd, "wb") as writer:
+            writer.write("".join(line + "\n" for line in lines).encode("utf-8"))
+        agent._message_thread.join(timeout=5)
+        assert not agent._message_thread.is_alive(), "Reader did not stop at EOF"
+        output = sys.stdout.getvalue()
+    finally:
+        sys.stdin.close()
+        sys.stdin, sys.stdout = saved_stdin, saved_stdout
+    return [json.loads(line) for line in output.splitlines()]
+
+
+def responses(messages):
+    """Map command ids to the data of their response messages"""
+    return {
+        message["data"]["command_id"]: message["data"]
+        for message in messages
+        if message["type"] == "response"
+    }
+
+
+def new_agent():
+    saved_stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    try:
+        agent = TestAgent()
+        agent.register_command("ping", lambda args: "pong")
+    finally:
+        sys.stdout = saved_stdout
+    return agent
+
+
+def test_non_json_lines_are_ignored():
+    """Test that lines which aren't JSON objects don't stop the reader"""
+    print("Testing non-JSON lines...")
+    messages = run_reader(new_agent(), [
+        "2024-01-01 manager started",
+        "42",
+        '["not", "an", "object"]',
+        command_line("1", "ping") + " trailing text",
+        "{broken",
+        command_line("2", "ping"),
+    ])
+
+    assert not any(m["type"] == "error" for m in messages), messages
+    replies = responses(messages)
+    assert list(replies) == ["2"], f"Expected only command 2 to run, got {replies}"
+    assert replies["2"]["result"] == "pong"
+
+    print("✓ Non-JSON lines tests passed")
+
+
+def test_several_objects_on_one_line():
+    """Test that whitespace-separated objects on one line are all handled"""
+    print("Testing several objects on one line...")
+    messages = run_reader(new_agent(), [
+        command_line("1", "ping") + "  " + command_line("2", "ping"),
+        command_line("3", "ping") + " 7",
+    ])
+
+    replies = responses(messages)
+    assert list(replies) == ["1", "2"], f"Expected commands 1 and 2, got {replies}"
+
+    print("✓ Several objects on one line passed")
+
+
+def test_invalid_arguments_get_error_response():
+    """Test that a bad argument fails its command without stopping the reader"""
+    print("Testing invalid arguments...")
+    agent = new_agent()
+    agent.register_command(
+        "sum",
+        lambda args: sum(args["values"]),
+        arguments=[{"name": "values", "type": "array", "items": {"type": "integer"}}],
+    )
+    messages = run_reader(agent, [
+        # 1e400 decodes to an infinite float, which int() can't convert
+        '{"type": "command", "data": {"id": "1", "command": "sum", '
+        '"args": {"values": [true, 1e400]}}}',
+        command_line("2", "sum", {"values": ["1", 2]}),
+    ])
+
+    replies = responses(messages)
+    assert list(replies) == ["1", "2"], f"Expected commands 1 and 2, got {replies}"
+    assert replies["1"]["success"] is False
+    assert replies["1"]["error"].startswith(
+        "Invalid value for 'values': 2 array items are invalid: index 0: "
+    ), replies["1"]["error"]
+    assert replies["2"] == {"success": True, "command_id": "2", "result": 3}
+
+    print("✓ Invalid arguments passed")
+
+
+def test_invalid_top_level_value_gets_error_response():
+    """Test that a scalar argument int() can't convert doesn't stop the reader"""
+    print("Testing invalid top-level values...")
+    agent = new_agent()
+    agent.register_command(
+        "repeat",
+        lambda args: "x" * args["count"],
+        arguments=[{"name": "count", "type": "integer"}],
+    )
+    messages = run_reader(agent, [
+        # int() raises OverflowError for infinity and TypeError for a dict
+        '{"type": "command", "data": {"id": "1", "command": "repeat", '
+        '"args": {"count": 1e400}}}',
+        command_line("2", "repeat", {"count": {}}),
+        command_line("3", "repeat", {"count": "3"}),
+    ])
+
+    assert not any(m["type"] == "error" for m in messages), messages
+    replies = responses(messages)
+    assert list(replies) == ["1", "2", "3"], f"Expected commands 1 to 3, got {replies}"
+    assert replies["1"]["success"] is False
+    assert replies["1"]["error"] == (
+        "Invalid value for 'count': cannot convert float infinity to integer"
+    ), replies["1"]["error"]
+    assert replies["2"]["success"] is False
+    assert replies["2"]["error"].startswith("Invalid value for 'count': "), replies["2"]["error"]
+    assert replies["3"] == {"success": True, "command_id": "3", "result": "xxx"}
+
+    print("✓ Invalid top-level values passed")
+
+
+def test_oversized_json_argument_is_rejected():
+    """Test that a JSON string over the size limit fails without stopping the reader"""
+    print("Testing oversized JSON arguments...")
+
+    class SmallLimitAgent(TestAgent):
+        max_json_argument_length = 32
+
+    saved_stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    try:
+        agent = SmallLimitAgent()
+        agent.register_command(
+            "count",
+            lambda args: len(args["values"]),
+            arguments=[{"name": "values", "type": "array", "items": {"type": "integer"}}],
+        )
+    finally:
+        sys.stdout = saved_stdout
+
+    oversized = json.dumps(list(range(20)))
+    messages = run_reader(agent, [
+        command_line("1", "count", {"values": oversized}),
+        command_line("2", "count", {"values": "[1, 2, 3]"}),
+        command_line("3", "count", {"values": list(range(20))}),
+    ])
+
+    replies = responses(messages)
+    assert list(replies) == ["1", "2", "3"], f"Expected commands 1 to 3, got {replies}"
+    assert replies["1"]["success"] is False
+    expected = (
+        f"Invalid value for 'values': "
+        f"JSON argument is {len(oversized)} characters; the limit is 32"
+    )
+    assert replies["1"]["error"] == expected, replies["1"]["error"]
+    assert replies["2"]["result"] == 3
+    # Lists that are already decoded aren't subject to the string limit
+    assert replies["3"]["result"] == 20
+
+    print("✓ Oversized JSON arguments passed")
+
+
+def test_stdin_without_file_descriptor():
+    """Test the reader with a stdin replaced by io.StringIO"""
+    print("Testing stdin without a file descriptor...")
+    agent = new_agent()
+    saved_stdin, saved_stdout = sys.stdin, sys.stdout
+    sys.stdin = io.StringIO(
+        "not json\n" + command_line("1", "ping") + "\n\n" + command_line("2", "ping")
+    )
+    sys.stdout = io.StringIO()
+    try:
+        agent._start_message_reader()
+        agent._message_thread.join(timeout=5)
+        output = sys.stdout.getvalue()
+    finally:
+        sys.stdin, sys.stdout = saved_stdin, saved_stdout
+
+    messages = [json.loads(line) for line in output.splitlines()]
+    assert not any(m["type"] == "error" for m in messages), messages
+    replies = responses(messages)
+    assert list(replies) == ["1", "2"], f"Expected commands 1 and 2, got {replies}"
+
+    print("✓ Stdin without a file descriptor passed")
+
+
+def test_iter_fd_lines():
+    """Test splitting lines across small reads"""
+    print("Testing iter_fd_lines...")
+    payload = b"first\n\nsecond line\nthird"
+    for chunk_size in (1, 3, 7, 65536):
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, payload)
+        os.close(write_fd)
+        try:
+            lines = list(iter_fd_lines(read_fd, chunk_size=chunk_size))
+        finally:
+            os.close(read_fd)
+        expected = [b"first\n", b"\n", b"second line\n", b"third"]
+        assert lines == expected, f"chunk_size={chunk_size}: got {lines}"
+
+    read_fd, write_fd = os.pipe()
+    os.close(write_fd)
+    try:
+        assert list(iter_fd_lines(read_fd)) == []
+    finally:
+        os.close(read_fd)
+
+    print("✓ iter_fd_lines passed")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Message Reader Tests")
+    print("=" * 60)
+    print()
+
+    try:
+        test_non_json_lines_are_ignored()
+        test_several_objects_on_one_line()
+        test_invalid_arguments_get_error_response()
+        test_invalid_top_level_value_gets_error_response()
+        test_oversized_json_argument_is_rejected()
+        test_stdin_without_file_descriptor()
+        test_iter_fd_lines()
+
+        print()
+        print("=" * 60)
+        print("✓ All tests passed!")
+        print("=" * 60)
+        sys.exit(0)
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print(f"✗ Test failed: {e}")
+        print("=" * 60)
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Test script for the protocol module.
+
+This script tests message output and command definitions, including:
+- Protocol.batch() flushing buffered lines on exit
+- Flushing when the block raises
+- Nested batches and other threads
+- Slash command normalization against the original per-character loop
+- Title derivation against the original multi-pass version
+- Normalized command definitions serializing like fresh ones
+- Pre-serialized responses matching send_response output
+"""
+
+import io
+import json
+import os
+import random
+import re
+import sys
+import threading
+from dataclasses import replace
+
+# Add the parent directory (python-base) to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from opperator.protocol import (
+    CommandArgument,
+    CommandDefinition,
+    CommandExposure,
+    LogLevel,
+    Protocol,
+    SlashCommandScope,
+    _encode_json,
+)
+
+
+class RecordingStdout:
+    """Text stream without a binary buffer that records each write"""
+
+    def __init__(self):
+        self.writes = []
+
+    def write(self, text):
+        self.writes.append(text)
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def messages(self):
+        return [json.loads(line) for line in "".join(self.writes).splitlines()]
+
+
+class RedirectedStdout:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def __enter__(self):
+        self._saved = sys.stdout
+        sys.stdout = self.stream
+        return self.stream
+
+    def __exit__(self, *exc_info):
+        sys.stdout = self._saved
+        return False
+
+
+def test_batch_flushes_on_exit():
+    """Test that batched lines are held and written once when the block exits"""
+    print("Testing batch flush on exit...")
+    with RedirectedStdout(RecordingStdout()) as stdout:
+        with Protocol.batch():
+            Protocol.send_log(LogLevel.INFO, "first")
+            Protocol.send_error("second")
+            Protocol.send_log(LogLevel.DEBUG, "third")
+            assert stdout.writes == [], f"Lines written before exit: {stdout.writes}"
+
+    assert len(stdout.writes) == 1, f"Expected one write, got {len(stdout.writes)}"
+    messages = stdout.messages()
+    assert [m["type"] for m in messages] == ["log", "error", "log"], messages
+    assert messages[0]["data"]["message"] == "first"
+    assert messages[1]["data"]["error"] == "second"
+    assert messages[2]["data"]["message"] == "third"
+
+    print("✓ Batch flush on exit passed")
+
+
+def test_batch_flushes_when_block_raises():
+    """Test that batched lines are still written when the block raises"""
+    print("Testing batch flush on exception...")
+    with RedirectedStdout(RecordingStdout()) as stdout:
+        try:
+            with Protocol.batch():
+                Protocol.send_log(LogLevel.ERROR, "before failure")
+                raise RuntimeError("boom")
+        except RuntimeError as exc:
+            assert str(exc) == "boom"
+        else:
+            assert False, "The exception should propagate out of the batch"
+
+        # Messages after the block are no longer buffered
+        Protocol.send_log(LogLevel.INFO, "after")
+
+    assert len(stdout.writes) == 2, stdout.writes
+    assert [m["data"]["message"] for m in stdout.messages()] == ["before failure", "after"]
+
+    print("✓ Batch flush on exception passed")
+
+
+def test_nested_batches_join_outer():
+    """Test that a nested batch is written with the outermost one"""
+    print("Testing nested batches...")
+    with RedirectedStdout(RecordingStdout()) as stdout:
+        with Protocol.batch():
+            Protocol.send_log(LogLevel.INFO, "outer")
+            with Protocol.batch():
+                Protocol.send_log(LogLevel.INFO, "inner")
+            assert stdout.writes == [], "Inner batch wrote before the outer exit"
+        with Protocol.batch():
+            pass
+
+    assert len(stdout.writes) == 1, stdout.writes
+    assert [m["data"]["message"] for m in stdout.messages()] == ["outer", "inner"]
+
+    print("✓ Nested batches passed")
+
+
+def test_batch_is_per_thread():
+    """Test that other threads' messages aren't held by a batch"""
+    print("Testing batch per thread...")
+    with RedirectedStdout(RecordingStdout()) as stdout:
+        with Protocol.batch():
+            worker = threading.Thread(
+                target=Protocol.send_log, args=(LogLevel.INFO, "from worker")
+            )
+            worker.start()
+            worker.join()
+            assert len(stdout.writes) == 1, "Worker thread message was buffered"
+            Protocol.send_log(LogLevel.INFO, "from batch")
+
+    assert [m["data"]["message"] for m in stdout.messages()] == ["from worker", "from batch"]
+
+    print("✓ Batch per thread passed")
+
+
+def test_batch_writes_to_binary_buffer():
+    """Test that a batch on a real text stream writes encoded bytes in order"""
+    print("Testing batch on a binary buffer...")
+    raw = io.BytesIO()
+    stream = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    with RedirectedStdout(stream):
+        stream.write("printed first\n")
+        with Protocol.batch():
+            Protocol.send_log(LogLevel.INFO, "héllo")
+            Protocol.send_log(LogLevel.INFO, "world")
+        stream.flush()
+
+    lines = raw.getvalue().decode("utf-8").splitlines()
+    assert lines[0] == "printed first", lines
+    assert [json.loads(line)["data"]["message"] for line in lines[1:]] == ["héllo", "world"]
+
+    print("✓ Batch on a binary buffer passed")
+
+
+def reference_normalize_slash(value):
+    """The original character-by-character slash command normalization"""
+    candidate = str(value).strip().lstrip('/')
+    if not candidate:
+        candidate = "command"
+    cleaned = []
+    for ch in candidate:
+        if ch.isalnum() or ch in {'_', '-', ':'}:
+            cleaned.append(ch.lower())
+        elif ch.isspace() and (not cleaned or cleaned[-1] != '_'):
+            cleaned.append('_')
+        elif cleaned and cleaned[-1] != '_':
+            cleaned.append('_')
+    slug = ''.join(cleaned).strip('_')
+    if not slug:
+        slug = candidate.replace(' ', '_').lower()
+    return f"/{slug}"
+
+
+# Letters, digits, allowed punctuation, separators and other symbols,
+# including non-ASCII letters and digits
+_SLASH_ALPHABET = "aZ09_-:/ .!?\t\n\u00e9\u00c9\u00df\u0661\u4e2d\u00bd@#$\u2014\u00a0"
+
+
+def test_normalize_slash_matches_original():
+    """Test slash normalization on random input against the original loop"""
+    print("Testing slash command normalization...")
+    rng = random.Random(4321)
+    for _ in range(20000):
+        value = "".join(rng.choices(_SLASH_ALPHABET, k=rng.randint(0, 12)))
+        expected = reference_normalize_slash(value)
+        result = CommandDefinition._normalize_slash(value)
+        assert result == expected, f"{value!r}: {result!r} != {expected!r}"
+
+    # Lowercasing the whole slug gives a word-final capital sigma its final
+    # form, where the per-character loop gave the medial one
+    assert CommandDefinition._normalize_slash("/ΣΑΣ") == "/σας"
+    assert reference_normalize_slash("/ΣΑΣ") == "/σασ"
+
+    print("✓ Slash command normalization passed")
+
+
+def reference_derive_title(name):
+    """The original title derivation, with one re.sub pass per rule"""
+    trimmed = str(name or "").strip()
+    if not trimmed:
+        return ""
+
+    cleaned = re.sub(r"[_\-\.:]+", " ", trimmed)
+    cleaned = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", cleaned)
+    cleaned = re.sub(r"([A-Z]+)([A-Z][a-z])", r"\1 \2", cleaned)
+    words = cleaned.split()
+    if not words:
+        return trimmed
+
+    def transform(word):
+        lower = word.lower()
+        if lower.isdigit():
+            return lower
+        if len(word) > 1 and word.isupper():
+            return word
+        return lower.capitalize()
+
+    return " ".join(transform(word) for word in words)
+
+
+# Cases, digits, separators, accented letters and punctuation
+_TITLE_ALPHABET = "aAbBzZ09_-.: \t\u00e9\u00c9!?'"
+
+
+def test_derive_title_matches_original():
+    """Test title derivation on random names against the original version"""
+    print("Testing title derivation...")
+    rng = random.Random(8765)
+    for _ in range(20000):
+        name = "".join(rng.choices(_TITLE_ALPHABET, k=rng.randint(0, 14)))
+        expected = reference_derive_title(name)
+        result = CommandDefinition._derive_title(name)
+        assert result == expected, f"{name!r}: {result!r} != {expected!r}"
+
+    for name, expected in [
+        ("get_status", "Get Status"),
+        ("HTTPServer", "HTTP Server"),
+        ("fooBarBaz", "Foo Bar Baz"),
+        ("v2Release", "V2 Release"),
+        ("caf\u00e9-cr\u00e8me!", "Caf\u00e9 Cr\u00e8me!"),
+        ("__", "__"),
+    ]:
+        assert CommandDefinition._derive_title(name) == expected, name
+
+    print("✓ Title derivation passed")
+
+
+def random_argument(rng):
+    fields = {
+        "name": rng.choice(["query", " limit ", "tags", "user"]),
+        "type": rng.choice(["string", " Integer", "array", "object", "bogus", None]),
+        "description": rng.choice([None, "", " Search text "]),
+        "required": rng.choice([False, True, 0, 1]),
+        "default": rng.choice([None, 0, "x", [1, 2], {"a": 1}]),
+        "enum": rng.choice([None, [], ["a", None, "b"], (1, 2)]),
+        "items": rng.choice([None, {"type": "integer"}]),
+        "properties": rng.choice([None, {"name": {"type": "string", "required": True}}]),
+    }
+    if rng.random() < 0.5:
+        return fields
+    return CommandArgument(**fields)
+
+
+def random_definition(rng):
+    return CommandDefinition(
+        name=rng.choice(["get_status", " fooBar ", "HTTPServer", "x"]),
+        title=rng.choice([None, "", " Custom Title "]),
+        description=rng.choice([None, " Does things "]),
+        expose_as=rng.choice([
+            None,
+            [],
+            [CommandExposure.SLASH_COMMAND],
+            ["agent_tool", " SLASH_COMMAND ", "unknown", CommandExposure.AGENT_TOOL],
+            CommandExposure.SLASH_COMMAND,
+        ]),
+        slash_command=rng.choice([None, "", "/Do It!", "status"]),
+        slash_scope=rng.choice([None, " Global ", "other", SlashCommandScope.GLOBAL]),
+        argument_hint=rng.choice([None, " <query> "]),
+        argument_required=rng.choice([False, True]),
+        arguments=rng.choice([None, []]) if rng.random() < 0.3 else [
+            random_argument(rng) for _ in range(rng.randint(1, 3))
+        ],
+        async_enabled=rng.choice([False, True]),
+        progress_label=rng.choice([None, " Working "]),
+        hidden=rng.choice([False, True]),
+    )
+
+
+def test_normalized_definitions_serialize_like_fresh_ones():
+    """Test that skipping renormalization doesn't change to_dict() output"""
+    print("Testing normalized command definitions...")
+    rng = random.Random(2468)
+    for _ in range(3000):
+        definition = random_definition(rng)
+        # replace() builds an unflagged, uncached copy that is normalized
+        # from scratch, as every call was before normalized() was flagged
+        expected = replace(definition).to_dict()
+
+        once = definition.normalized()
+        twice = once.normalized()
+        assert twice is once, "normalized() should return a normalized instance as is"
+        assert definition.to_dict() == expected
+        assert once.to_dict() == expected
+        assert twice.to_dict() == expected
+        assert replace(once).to_dict() == expected
+        assert json.loads(json.dumps(expected)) == expected
+
+        for argument in once.arguments or ():
+            assert argument.normalized() is argument
+            assert argument.to_dict() == replace(argument).to_dict()
+
+    print("✓ Normalized command definitions passed")
+
+
+_TIMESTAMP = re.compile(r'"timestamp": "[^"]*"')
+
+
+def test_serialized_response_matches_send_response():
+    """Test that send_serialized_response writes what send_response would"""
+    print("Testing pre-serialized responses...")
+    results = [
+        [],
+        [{"name": "ping", "title": "Ping", "expose_as": ["agent_tool"]}],
+        {"nested": {"list": [1, 2.5, None, True]}, "text": "h\u00e9llo \"quoted\"\n"},
+        "plain string",
+        0,
+        False,
+    ]
+    for command_id in ["cmd-1", "", None]:
+        for result in results:
+            with RedirectedStdout(RecordingStdout()) as expected:
+                Protocol.send_response(success=True, command_id=command_id, result=result)
+            with RedirectedStdout(RecordingStdout()) as actual:
+                Protocol.send_serialized_response(command_id, _encode_json(result))
+
+            expected_line = _TIMESTAMP.sub('"timestamp": ""', "".join(expected.writes))
+            actual_line = _TIMESTAMP.sub('"timestamp": ""', "".join(actual.writes))
+            assert actual_line == expected_line, f"{actual_line!r} != {expected_line!r}"
+
+    print("✓ Pre-serialized responses passed")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Protocol Tests")
+    print("=" * 60)
+    print()
+
+    try:
+        test_batch_flushes_on_exit()
+        test_batch_flushes_when_block_raises()
+        test_nested_batches_join_outer()
+        test_batch_is_per_thread()
+        test_batch_writes_to_binary_buffer()
+        test_normalize_slash_matches_original()
+        test_derive_title_matches_original()
+        test_normalized_definitions_serialize_like_fresh_ones()
+        test_serialized_response_matches_send_response()
+
+        print()
+        print("=" * 60)
+        print("✓ All tests passed!")
+        print("=" * 60)
+        sys.exit(0)
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print(f"✗ Test failed: {e}")
+        print("=" * 60)
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)